@@ -1,9 +1,76 @@
-from openai import OpenAI
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from search_cache import SearchCache, normalize_question
+from tracing import extract, flush, setup_tracing, span
+
+INIT_STARTED = time.perf_counter()
 
 INSTRUCTIONS = """
 - You must answer the question using web_search tool.
 - You must respond in japanese.
 """
+EMBEDDING_MODEL = os.getenv("SEARCH_CACHE_EMBEDDING_MODEL", "text-embedding-3-small")
+# Import the OpenAI SDK and build its client during the init phase instead of
+# on the first invocation. Set to "false" to defer it until a cache miss.
+OPENAI_PREWARM = os.getenv("OPENAI_PREWARM", "true").lower() == "true"
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "600"))
+# How long idle connections stay pooled; httpx drops them after 5s by default.
+OPENAI_KEEPALIVE_SECONDS = float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "120"))
+MAX_BATCH_QUESTIONS = int(os.getenv("MAX_BATCH_QUESTIONS", "10"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "5"))
+# The Gateway passes "<target>___<tool>" as the tool name.
+TOOL_NAME_DELIMITER = "___"
+
+# Keeps the provider of the ADOT Lambda layer; exports locally with OTEL_TRACES_FILE.
+setup_tracing(os.getenv("AWS_LAMBDA_FUNCTION_NAME", "openai-web-search-lambda"))
+
+# Module scope, so warm invocations of the same execution environment share it.
+search_cache = SearchCache.from_env()
+openai_client = None
+openai_client_init_ms = None
+openai_client_lock = threading.Lock()
+batch_executor = None
+cold_start = True
+
+
+def get_openai_client():
+    global openai_client, openai_client_init_ms
+    # Batch questions run on worker threads; only one of them may build the client.
+    with openai_client_lock:
+        if openai_client is None:
+            started = time.perf_counter()
+            import httpx
+            from openai import DefaultHttpxClient, OpenAI
+
+            openai_client = OpenAI(
+                timeout=OPENAI_TIMEOUT,
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=max(BATCH_CONCURRENCY, 10),
+                        max_keepalive_connections=max(BATCH_CONCURRENCY, 10),
+                        keepalive_expiry=OPENAI_KEEPALIVE_SECONDS,
+                    )
+                ),
+            )
+            openai_client_init_ms = (time.perf_counter() - started) * 1000
+    return openai_client
+
+
+def embed_question(client, question: str) -> list[float]:
+    with span("openai.embeddings.create", **{"gen_ai.request.model": EMBEDDING_MODEL}):
+        response = client.embeddings.create(
+            model=EMBEDDING_MODEL, input=normalize_question(question)
+        )
+    return response.data[0].embedding
+
+
+def log_cache_lookup(hit: bool):
+    print(json.dumps({"search_cache": "hit" if hit else "miss", **search_cache.stats()}))
 
 
 def openai_web_search(question: str) -> str:
@@ -16,20 +83,125 @@ def openai_web_search(question: str) -> str:
     Returns:
         str: The search results with advanced reasoning and analysis.
     """
-    client = OpenAI()
-    response = client.responses.create(
-        model="gpt-5",
-        tools=[{"type": "web_search"}],
-        # reasoning={"effort": "high"},
-        instructions=INSTRUCTIONS,
-        input=question,
-    )
+    embedding = None
+    if search_cache:
+        with span("search_cache.get") as current:
+            cached = search_cache.get(question)
+            if cached is None and search_cache.semantic:
+                # Only misses pay for the embedding round-trip.
+                embedding = embed_question(get_openai_client(), question)
+                cached = search_cache.get_similar(embedding)
+            if current is not None:
+                current.set_attribute("search_cache.hit", cached is not None)
+        log_cache_lookup(cached is not None)
+        if cached is not None:
+            return cached
+
+    client = get_openai_client()
+    with span("openai.responses.create", **{"gen_ai.request.model": "gpt-5"}):
+        response = client.responses.create(
+            model="gpt-5",
+            tools=[{"type": "web_search"}],
+            # reasoning={"effort": "high"},
+            instructions=INSTRUCTIONS,
+            input=question,
+        )
+    if search_cache:
+        search_cache.set(question, response.output_text, embedding)
     return response.output_text
 
 
+def openai_web_search_batch(questions: list[str]) -> list[dict]:
+    """Run several web searches in parallel with the same capabilities as openai_web_search.
+
+    Args:
+        questions: The search questions to perform.
+
+    Returns:
+        list[dict]: Results in the same order as `questions`. Each item has `question` and either
+        `answer` or `error`.
+    """
+    global batch_executor
+    if not questions:
+        raise ValueError("no questions given")
+    if len(questions) > MAX_BATCH_QUESTIONS:
+        raise ValueError(f"at most {MAX_BATCH_QUESTIONS} questions per call")
+    if batch_executor is None:
+        # Kept across warm invocations, like the OpenAI client.
+        batch_executor = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY)
+
+    def answer(question: str) -> dict:
+        try:
+            return {"question": question, "answer": openai_web_search(question)}
+        except Exception as e:
+            return {"question": question, "error": str(e)}
+
+    # Worker threads do not inherit the current span; run each question in a copy of it.
+    contexts = [contextvars.copy_context() for _ in questions]
+    return list(batch_executor.map(lambda ctx, q: ctx.run(answer, q), contexts, questions))
+
+
+def trace_parent(context):
+    """Trace context forwarded in the client context, if the caller sent one."""
+    try:
+        return extract(context.client_context.custom)
+    except AttributeError:
+        return None
+
+
+def get_tool_name(context) -> str:
+    try:
+        name = context.client_context.custom["bedrockAgentCoreToolName"]
+    except (AttributeError, KeyError, TypeError):
+        # Direct invocations (e.g. from the console) carry no tool name.
+        return "openai_web_search"
+    return name.split(TOOL_NAME_DELIMITER, 1)[-1]
+
+
+def log_invocation(handler_ms: float, client_init_ms: float | None):
+    print(
+        json.dumps(
+            {
+                "cold_start": cold_start,
+                "init_ms": round(INIT_DURATION_MS, 1) if cold_start else None,
+                "handler_ms": round(handler_ms, 1),
+                "openai_client_init_ms": client_init_ms and round(client_init_ms, 1),
+            }
+        )
+    )
+
+
 def lambda_handler(event, context):
+    global cold_start
+    started = time.perf_counter()
+    client_ready = openai_client is not None
+    tool_name = get_tool_name(context)
     try:
-        result = openai_web_search(event.get("question"))
+        with span(
+            f"tool.{tool_name}", parent=trace_parent(context), **{"faas.coldstart": cold_start}
+        ):
+            if tool_name == "openai_web_search_batch":
+                result = openai_web_search_batch(event.get("questions"))
+            elif tool_name == "openai_web_search":
+                result = openai_web_search(event.get("question"))
+            else:
+                return {"statusCode": 400, "body": f"Error occurred: unknown tool {tool_name}"}
         return {"statusCode": 200, "body": result}
     except Exception as e:
         return {"statusCode": 500, "body": f"Error occurred: {str(e)}"}
+    finally:
+        flush()
+        # Only report the client setup cost when this invocation paid for it.
+        client_init_ms = None if client_ready else openai_client_init_ms
+        log_invocation((time.perf_counter() - started) * 1000, client_init_ms)
+        cold_start = False
+
+
+if OPENAI_PREWARM:
+    try:
+        get_openai_client()
+    except Exception as e:
+        # Leave the error to the first invocation, where it is reported to the caller.
+        print(f"OpenAI client prewarm failed: {e}")
+
+INIT_DURATION_MS = (time.perf_counter() - INIT_STARTED) * 1000
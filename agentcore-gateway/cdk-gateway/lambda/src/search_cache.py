@@ -0,0 +1,181 @@
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+TRAILING_PUNCTUATION = "?？!！.。、,， "
+
+
+def normalize_question(question: str) -> str:
+    """Fold width, case and whitespace so trivially different questions share a key."""
+    text = unicodedata.normalize("NFKC", question).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.rstrip(TRAILING_PUNCTUATION)
+
+
+def cosine_similarity(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry expiry. Safe to share between threads."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DynamoDBBackend:
+    """Shared cache in a DynamoDB table with partition key `cache_key` (string).
+
+    Enable DynamoDB TTL on the `expires_at` attribute so expired items are
+    purged; reads also ignore them.
+    """
+
+    def __init__(self, table_name: str):
+        import boto3
+
+        self._table = boto3.resource("dynamodb").Table(table_name)
+
+    def get(self, key: str) -> str | None:
+        item = self._table.get_item(Key={"cache_key": key}).get("Item")
+        if not item or int(item["expires_at"]) < time.time():
+            return None
+        return item["value"]
+
+    def set(self, key: str, value: str, ttl: float):
+        self._table.put_item(
+            Item={
+                "cache_key": key,
+                "value": value,
+                "expires_at": int(time.time() + ttl),
+            }
+        )
+
+
+class SearchCache:
+    """Answer cache for web-search questions.
+
+    Exact matches use the normalized question text. When `similarity_threshold`
+    is set, callers embed the question only after `get()` misses and fall back
+    to `get_similar()`, which returns the answer of the most similar recently
+    cached question; the miss is then counted there. The scan compares against
+    every stored embedding, so async callers should run it off the event loop.
+    The embedding index is kept in process, so with a shared backend
+    near-duplicate matching only covers questions this instance has seen.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttl: float = 3600.0,
+        max_entries: int = 1024,
+        similarity_threshold: float | None = None,
+    ):
+        self.backend = backend or MemoryBackend(max_entries)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._embeddings = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "SearchCache | None":
+        """Build the cache from SEARCH_CACHE_* variables; TTL 0 disables it."""
+        ttl = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+        if ttl <= 0:
+            return None
+        max_entries = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024"))
+        table_name = os.getenv("SEARCH_CACHE_TABLE")
+        threshold = os.getenv("SEARCH_CACHE_SIMILARITY")
+        return cls(
+            backend=DynamoDBBackend(table_name) if table_name else None,
+            ttl=ttl,
+            max_entries=max_entries,
+            similarity_threshold=float(threshold) if threshold else None,
+        )
+
+    @property
+    def semantic(self) -> bool:
+        return self.similarity_threshold is not None
+
+    @staticmethod
+    def key(question: str) -> str:
+        return hashlib.sha256(normalize_question(question).encode()).hexdigest()
+
+    def get(self, question: str) -> str | None:
+        answer = self.backend.get(self.key(question))
+        if answer is not None:
+            self.hits += 1
+        elif not self.semantic:
+            self.misses += 1
+        return answer
+
+    def get_similar(self, embedding: list[float]) -> str | None:
+        best_key, best_score = None, self.similarity_threshold
+        with self._lock:
+            candidates = list(self._embeddings.items())
+        for cached_key, cached_embedding in candidates:
+            score = cosine_similarity(embedding, cached_embedding)
+            if score >= best_score:
+                best_key, best_score = cached_key, score
+        if best_key is not None:
+            answer = self.backend.get(best_key)
+            with self._lock:
+                if answer is not None:
+                    self.semantic_hits += 1
+                    if best_key in self._embeddings:
+                        self._embeddings.move_to_end(best_key)
+                    return answer
+                self._embeddings.pop(best_key, None)
+
+        self.misses += 1
+        return None
+
+    def set(self, question: str, answer: str, embedding: list[float] | None = None):
+        key = self.key(question)
+        self.backend.set(key, answer, self.ttl)
+        if self.semantic and embedding is not None:
+            with self._lock:
+                self._embeddings[key] = embedding
+                self._embeddings.move_to_end(key)
+                while len(self._embeddings) > self.max_entries:
+                    self._embeddings.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+        }
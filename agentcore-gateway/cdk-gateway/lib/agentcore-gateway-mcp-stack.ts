@@ -229,6 +229,25 @@ export class AgentCoreGatewayLambdaMCPStack extends cdk.Stack {
                     required: ["question"],
                   },
                 },
+                {
+                  name: "openai_web_search_batch",
+                  description:
+                    "Run several web searches in parallel with the same capabilities as openai_web_search. Use this instead of calling openai_web_search repeatedly when you have multiple related questions; the call takes about as long as the slowest question. Returns results in the same order as the questions, each with either an answer or an error.",
+                  inputSchema: {
+                    type: "object",
+                    properties: {
+                      questions: {
+                        type: "array",
+                        description:
+                          "Up to 10 independent questions to search in parallel. Each question follows the same rules as openai_web_search: write in Japanese and be direct and specific.",
+                        items: {
+                          type: "string",
+                        },
+                      },
+                    },
+                    required: ["questions"],
+                  },
+                },
               ],
             },
           },
@@ -2,23 +2,25 @@ import asyncio
 import json
 import os
 
-import requests
-from bedrock_agentcore.identity.auth import requires_access_token
 from dotenv import load_dotenv
 
+from jsonrpc_client import JsonRpcClient
+from token_provider import TokenProvider
+
 load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
 
 
-@requires_access_token(
+token_provider = TokenProvider(
     provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
     scopes=[
         os.getenv("OAUTH2_SCOPE_READ"),
         os.getenv("OAUTH2_SCOPE_WRITE"),
     ],
-    auth_flow="M2M",
 )
-async def get_access_token(*, access_token: str) -> str:
-    return access_token
+
+
+async def get_access_token() -> str:
+    return await token_provider.get_token()
 
 
 def validate_env_vars():
@@ -35,29 +37,18 @@ def validate_env_vars():
         )
 
 
-def list_tools(gateway_url, access_token):
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
-
-    payload = {
-        "jsonrpc": "2.0",
-        "id": "list-tools",
-        "method": "tools/list",
-    }
-
-    response = requests.post(gateway_url, headers=headers, json=payload)
-    return response.json()
+async def list_tools(gateway_url, access_token):
+    async with JsonRpcClient(gateway_url, access_token) as client:
+        return await client.list_tools()
 
 
 async def main():
     validate_env_vars()
 
-    access_token = await get_access_token(access_token="")
+    access_token = await get_access_token()
     mcp_endpoint = os.getenv("GATEWAY_ENDPOINT_URL", "")
 
-    results = list_tools(mcp_endpoint, access_token)
+    results = await list_tools(mcp_endpoint, access_token)
     print(json.dumps(results, indent=2))
 
 
@@ -1,24 +1,27 @@
 import asyncio
 import json
 import os
+import sys
 
-import requests
-from bedrock_agentcore.identity.auth import requires_access_token
 from dotenv import load_dotenv
 
+from jsonrpc_client import JsonRpcClient
+from token_provider import TokenProvider
+
 load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
 
 
-@requires_access_token(
+token_provider = TokenProvider(
     provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
     scopes=[
         os.getenv("OAUTH2_SCOPE_READ"),
         os.getenv("OAUTH2_SCOPE_WRITE"),
     ],
-    auth_flow="M2M",
 )
-async def get_access_token(*, access_token: str) -> str:
-    return access_token
+
+
+async def get_access_token() -> str:
+    return await token_provider.get_token()
 
 
 def validate_env_vars():
@@ -35,34 +38,33 @@ def validate_env_vars():
         )
 
 
-def search_tools(gateway_url, access_token, query):
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {access_token}",
-    }
-
-    payload = {
-        "jsonrpc": "2.0",
-        "id": "search-tools-request",
-        "method": "tools/call",
-        "params": {
+def search_request(query):
+    return (
+        "tools/call",
+        {
             "name": "x_amz_bedrock_agentcore_search",
             "arguments": {"query": query},
         },
-    }
+    )
+
 
-    response = requests.post(gateway_url, headers=headers, json=payload)
-    return response.json()
+async def search_tools(gateway_url, access_token, queries):
+    async with JsonRpcClient(gateway_url, access_token) as client:
+        return await client.batch([search_request(query) for query in queries])
 
 
 async def main():
     validate_env_vars()
 
-    access_token = await get_access_token(access_token="")
+    access_token = await get_access_token()
     mcp_endpoint = os.getenv("GATEWAY_ENDPOINT_URL", "")
 
-    results = search_tools(mcp_endpoint, access_token, "search information")
-    print(json.dumps(results, indent=2))
+    queries = sys.argv[1:] or ["search information"]
+
+    results = await search_tools(mcp_endpoint, access_token, queries)
+    for query, result in zip(queries, results):
+        print(f"🔍 {query}")
+        print(json.dumps(result, indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from resilience import ResilientCaller
+from router import TARGET_SEPARATOR
+from token_provider import TokenProvider
+from tracing import flush, inject, setup_tracing, span
+
+load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
+
+TOOL_NAME = "openai_web_search"
+
+token_provider = TokenProvider(
+    provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
+    scopes=[
+        os.getenv("OAUTH2_SCOPE_READ"),
+        os.getenv("OAUTH2_SCOPE_WRITE"),
+    ],
+)
+
+
+async def get_access_token() -> str:
+    return await token_provider.get_token()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Call openai_web_search through the Gateway with deadlines, retries and hedging"
+    )
+    parser.add_argument("question", nargs="?", default="Claude Skillsについて調べて。")
+    parser.add_argument(
+        "--endpoint",
+        help="MCP endpoint URL (default: GATEWAY_ENDPOINT_URL)",
+    )
+    parser.add_argument(
+        "--no-auth",
+        action="store_true",
+        help="Send no Authorization header (for a local Gateway)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=300.0,
+        help="Seconds the call may take in total, across retries and hedges",
+    )
+    parser.add_argument(
+        "--max-attempts", type=int, default=3, help="Attempts per call, including the first"
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        help="Seconds before sending a duplicate request (default: p95 of earlier calls)",
+    )
+    parser.add_argument("--no-hedge", action="store_true", help="Never send a duplicate request")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Ask the question this many times on one session and print resilience metrics",
+    )
+    parser.add_argument(
+        "--trace-file",
+        help="Write OpenTelemetry spans to this JSON Lines file (default: OTEL_TRACES_FILE)",
+    )
+    return parser.parse_args()
+
+
+def validate_env_vars(endpoint: bool = True, auth: bool = True):
+    required = []
+    if endpoint:
+        required.append("GATEWAY_ENDPOINT_URL")
+    if auth:
+        required += ["OAUTH2_PROVIDER_NAME", "OAUTH2_SCOPE_READ", "OAUTH2_SCOPE_WRITE"]
+    missing = [var for var in required if not os.getenv(var)]
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+
+async def resolve_tool_name(session: ClientSession, name: str) -> str:
+    # The Gateway prefixes tool names with the target name.
+    tools = (await session.list_tools()).tools
+    for tool in tools:
+        if tool.name.split(TARGET_SEPARATOR)[-1] == name:
+            return tool.name
+    raise ValueError(f"Tool {name!r} not found on the Gateway")
+
+
+async def call_tool(caller: ResilientCaller, tool_name: str, question: str, deadline: float):
+    print(f"🔍 {question}\n")
+
+    start = time.perf_counter()
+    result = await caller.call_tool(tool_name, {"question": question}, deadline=deadline)
+    elapsed = time.perf_counter() - start
+
+    print("".join(c.text for c in result.content if c.type == "text"))
+    print(f"\n⏱️ Total: {elapsed:.3f}s")
+
+
+async def run(endpoint: str, access_token: str, args):
+    headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+
+    with span("mcp.session", **{"server.address": endpoint}):
+        async with streamablehttp_client(
+            endpoint, inject(headers), timeout=args.deadline, terminate_on_close=False
+        ) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as session:
+                with span("mcp.initialize"):
+                    await session.initialize()
+                with span("mcp.list_tools"):
+                    tool_name = await resolve_tool_name(session, TOOL_NAME)
+                caller = ResilientCaller(
+                    session,
+                    default_deadline=args.deadline,
+                    max_attempts=args.max_attempts,
+                    hedge=not args.no_hedge,
+                    hedge_after=args.hedge_after,
+                )
+                for _ in range(args.repeat):
+                    try:
+                        await call_tool(caller, tool_name, args.question, deadline=args.deadline)
+                    except Exception as e:
+                        print(f"❌ {type(e).__name__}: {e}\n")
+                if args.repeat > 1:
+                    print(f"📊 {caller.metrics()}")
+
+
+async def main():
+    args = parse_args()
+    validate_env_vars(endpoint=args.endpoint is None, auth=not args.no_auth)
+
+    access_token = "" if args.no_auth else await get_access_token()
+    endpoint = args.endpoint or os.getenv("GATEWAY_ENDPOINT_URL", "")
+
+    setup_tracing("mcp-client", args.trace_file)
+    try:
+        await run(endpoint, access_token, args)
+    finally:
+        flush()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,145 @@
+import asyncio
+import itertools
+import json
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# JSON-RPC "Invalid Request": what a server without batch support answers to an array.
+INVALID_REQUEST = -32600
+# Client errors that say nothing about batch support; the batch may work on retry.
+TRANSIENT_STATUS = {408, 429}
+
+
+class BatchRejected(Exception):
+    """The endpoint does not accept JSON-RPC batch arrays."""
+
+
+class JsonRpcClient:
+    """Async JSON-RPC client for the Gateway MCP endpoint over a pooled connection.
+
+    Requests share one keep-alive connection pool (HTTP/2 when `h2` is
+    installed), so many concurrent calls reuse a few TCP+TLS connections.
+    `batch()` sends JSON-RPC batch arrays and falls back to concurrent single
+    requests if the endpoint does not accept batches. Only calls left without
+    a response are resent, so calls answered in a batch never run twice.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        access_token: str,
+        max_connections: int = 10,
+        max_batch_size: int = 20,
+        timeout: float = 120.0,
+    ):
+        self.url = url
+        self.max_batch_size = max_batch_size
+        self.batch_supported = None
+        self._ids = itertools.count(1)
+        self._client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "application/json, text/event-stream",
+                "Authorization": f"Bearer {access_token}",
+            },
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            timeout=timeout,
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    @staticmethod
+    def _decode(response: httpx.Response):
+        # Streamable-http servers may answer with a single-event SSE stream.
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            data = [
+                line[len("data:") :].strip()
+                for line in response.text.splitlines()
+                if line.startswith("data:")
+            ]
+            return json.loads(data[-1])
+        return response.json()
+
+    def _message(self, method: str, params: dict | None = None) -> dict:
+        message = {"jsonrpc": "2.0", "id": next(self._ids), "method": method}
+        if params is not None:
+            message["params"] = params
+        return message
+
+    async def request(self, method: str, params: dict | None = None) -> dict:
+        response = await self._client.post(self.url, json=self._message(method, params))
+        response.raise_for_status()
+        return self._decode(response)
+
+    async def _send_batch(self, messages: list[dict]) -> list[dict | None]:
+        """Responses to `messages` in order, None where the server sent none."""
+        response = await self._client.post(self.url, json=messages)
+        if response.is_client_error and response.status_code not in TRANSIENT_STATUS:
+            raise BatchRejected(f"HTTP {response.status_code}")
+        unanswered = [None] * len(messages)
+        if response.is_error:
+            return unanswered
+        try:
+            body = self._decode(response)
+        except (ValueError, IndexError):
+            return unanswered
+        if isinstance(body, dict) and (body.get("error") or {}).get("code") == INVALID_REQUEST:
+            raise BatchRejected(body["error"].get("message"))
+        if not isinstance(body, list):
+            return unanswered
+        by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+        return [by_id.get(message["id"]) for message in messages]
+
+    async def batch(self, calls: list[tuple[str, dict | None]]) -> list[dict]:
+        """Send (method, params) pairs and return their responses in order."""
+        responses = [None] * len(calls)
+        if self.batch_supported is not False:
+            messages = [self._message(method, params) for method, params in calls]
+            starts = range(0, len(messages), self.max_batch_size)
+            results = await asyncio.gather(
+                *(self._send_batch(messages[i : i + self.max_batch_size]) for i in starts),
+                return_exceptions=True,
+            )
+            for start, result in zip(starts, results):
+                if isinstance(result, BatchRejected):
+                    # Only a rejection turns batching off; other failures may be transient.
+                    self.batch_supported = False
+                elif isinstance(result, BaseException):
+                    raise result
+                else:
+                    responses[start : start + len(result)] = result
+            if self.batch_supported is None and any(r is not None for r in responses):
+                self.batch_supported = True
+
+        missing = [i for i, response in enumerate(responses) if response is None]
+        resent = await asyncio.gather(*(self.request(*calls[i]) for i in missing))
+        for i, response in zip(missing, resent):
+            responses[i] = response
+        return responses
+
+    async def list_tools(self) -> dict:
+        return await self.request("tools/list")
+
+    async def call_tool(self, name: str, arguments: dict) -> dict:
+        return await self.request(
+            "tools/call", {"name": name, "arguments": arguments}
+        )
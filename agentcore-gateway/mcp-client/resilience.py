@@ -0,0 +1,235 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+
+from router import TARGET_SEPARATOR, ToolCallError, result_error
+from tracing import inject, span
+
+# Tools that are safe to send more than once (retries and hedges).
+IDEMPOTENT_TOOLS = ("openai_web_search", "openai_web_search_batch")
+# Remaining time budget sent to the server in the request's _meta.
+DEADLINE_META_KEY = "timeoutMs"
+# How long the server asks us to wait after rejecting a call, in the result's _meta.
+RETRY_AFTER_META_KEY = "retryAfterMs"
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Overloaded(ToolCallError):
+    """The server rejected the call without running it and asked to retry later."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ResilientCaller:
+    """Wraps `ClientSession.call_tool` with deadlines, retries and hedging.
+
+    Every call has a deadline (`deadline` seconds, default `default_deadline`)
+    that bounds all of its attempts; each attempt uses the remaining time as
+    its read timeout and sends it to the server as `_meta.timeoutMs` so the
+    server can stop waiting for work nobody will receive. Idempotent tools are
+    retried with exponential backoff and full jitter, up to `max_attempts`,
+    as long as the backoff fits in the deadline; calls the server rejected as
+    overloaded are retried even if not idempotent, since they never ran, and
+    wait at least the server's retry-after hint. If an idempotent call has not
+    answered after `hedge_after` seconds (default: the tool's recent p95
+    latency, once `min_samples` calls succeeded) a duplicate is sent on
+    `hedge_session` and the first success wins. Without a `hedge_session` the
+    duplicate goes out on the same session; a server that merges identical
+    in-flight calls (the Runtime's single-flight search) then answers both
+    with the same work, so hedging only helps against a stalled transport.
+    `metrics()` reports how often retries and hedges happened and how often
+    the hedge won.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession,
+        hedge_session: ClientSession | None = None,
+        idempotent_tools=IDEMPOTENT_TOOLS,
+        default_deadline: float = 300.0,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = True,
+        hedge_after: float | None = None,
+        min_samples: int = 10,
+        window: int = 100,
+    ):
+        self.session = session
+        self.hedge_session = hedge_session or session
+        self.idempotent_tools = set(idempotent_tools)
+        self.default_deadline = default_deadline
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.min_samples = min_samples
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self.counts = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "deadline_exceeded": 0,
+            "overloaded": 0,
+            "failures": 0,
+        }
+
+    def is_idempotent(self, name: str) -> bool:
+        return name.split(TARGET_SEPARATOR)[-1] in self.idempotent_tools
+
+    def p95(self, name: str) -> float | None:
+        samples = self._latencies[name]
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    def _hedge_delay(self, name: str, idempotent: bool) -> float | None:
+        if not self.hedge or not idempotent:
+            return None
+        return self.hedge_after if self.hedge_after is not None else self.p95(name)
+
+    async def _send(
+        self,
+        session: ClientSession,
+        name: str,
+        arguments: dict,
+        deadline_at: float,
+        progress_callback,
+    ):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{name}: deadline exceeded")
+        self.counts["attempts"] += 1
+        start = time.monotonic()
+        with span(
+            "mcp.call_tool",
+            **{"mcp.tool.name": name, "mcp.deadline_ms": int(remaining * 1000)},
+        ):
+            try:
+                async with asyncio.timeout(remaining):
+                    result = await session.call_tool(
+                        name,
+                        arguments,
+                        read_timeout_seconds=timedelta(seconds=remaining),
+                        progress_callback=progress_callback,
+                        # Each attempt (and hedge) is its own span, so the server links to it.
+                        meta={DEADLINE_META_KEY: int(remaining * 1000), **inject()},
+                    )
+            except TimeoutError as e:
+                raise DeadlineExceeded(f"{name}: deadline exceeded") from e
+            error = result_error(result)
+            if error is not None:
+                retry_after_ms = (result.meta or {}).get(RETRY_AFTER_META_KEY)
+                if retry_after_ms is not None:
+                    self.counts["overloaded"] += 1
+                    raise Overloaded(error, retry_after_ms / 1000)
+                raise ToolCallError(error)
+        self._latencies[name].append(time.monotonic() - start)
+        return result
+
+    async def _attempt(
+        self, name: str, arguments: dict, deadline_at: float, progress_callback, idempotent: bool
+    ):
+        """One attempt, hedged with a duplicate request if the first one is slow."""
+        primary = asyncio.ensure_future(
+            self._send(self.session, name, arguments, deadline_at, progress_callback)
+        )
+        tasks = [primary]
+        try:
+            delay = self._hedge_delay(name, idempotent)
+            if delay is not None and delay < deadline_at - time.monotonic():
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.counts["hedges"] += 1
+                    # Only the primary streams progress, so output is not duplicated.
+                    tasks.append(
+                        asyncio.ensure_future(
+                            self._send(self.hedge_session, name, arguments, deadline_at, None)
+                        )
+                    )
+
+            error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.counts["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict,
+        deadline: float | None = None,
+        progress_callback=None,
+        idempotent: bool | None = None,
+    ):
+        """Call a tool; `idempotent` overrides the per-tool default for this call."""
+        self.counts["calls"] += 1
+        deadline_at = time.monotonic() + (deadline or self.default_deadline)
+        if idempotent is None:
+            idempotent = self.is_idempotent(name)
+
+        for attempt in range(self.max_attempts):
+            try:
+                return await self._attempt(
+                    name, arguments, deadline_at, progress_callback, idempotent
+                )
+            except DeadlineExceeded:
+                self.counts["deadline_exceeded"] += 1
+                self.counts["failures"] += 1
+                raise
+            except (ToolCallError, McpError, OSError, ExceptionGroup) as e:
+                if time.monotonic() >= deadline_at:
+                    # The session's read timeout fired at the deadline.
+                    self.counts["deadline_exceeded"] += 1
+                    self.counts["failures"] += 1
+                    raise DeadlineExceeded(f"{name}: deadline exceeded") from e
+                backoff = max(self._backoff(attempt), getattr(e, "retry_after", 0.0))
+                if (
+                    not (idempotent or isinstance(e, Overloaded))
+                    or attempt + 1 == self.max_attempts
+                    or time.monotonic() + backoff >= deadline_at
+                ):
+                    self.counts["failures"] += 1
+                    raise
+                self.counts["retries"] += 1
+                print(f"⚠️ {name} failed ({e}); retrying in {backoff:.2f}s")
+                await asyncio.sleep(backoff)
+
+    def metrics(self) -> dict:
+        counts = dict(self.counts)
+        counts["hedge_win_rate"] = (
+            round(counts["hedge_wins"] / counts["hedges"], 3) if counts["hedges"] else None
+        )
+        counts["p95"] = {
+            name: round(p95, 3)
+            for name in self._latencies
+            if (p95 := self.p95(name)) is not None
+        }
+        return counts
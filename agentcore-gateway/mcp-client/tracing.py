@@ -0,0 +1,104 @@
+import contextlib
+import os
+
+try:
+    from opentelemetry import propagate, trace
+except ImportError:
+    # Tracing is optional: without the OpenTelemetry API every helper is a no-op.
+    trace = None
+
+try:
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class FileSpanExporter(SpanExporter):
+        """Appends finished spans to a JSON Lines file, one span per line."""
+
+        def __init__(self, path: str):
+            self._file = open(path, "a")
+
+        def export(self, spans):
+            for finished in spans:
+                self._file.write(finished.to_json(indent=None) + "\n")
+            self._file.flush()
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            self._file.close()
+
+except ImportError:
+    FileSpanExporter = None
+
+TRACER_NAME = "agentcore-mcp"
+TRACE_FILE_ENV = "OTEL_TRACES_FILE"
+
+
+def setup_tracing(service_name: str, trace_file: str | None = None) -> bool:
+    """Install a tracer provider that exports spans; returns whether spans are exported.
+
+    Spans go to `trace_file` (default: `OTEL_TRACES_FILE`) as JSON Lines, or
+    over OTLP/HTTP when `OTEL_EXPORTER_OTLP_ENDPOINT` is set. A provider that
+    is already installed (e.g. by `opentelemetry-instrument`) is kept as is.
+    """
+    if trace is None:
+        return False
+    if not isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider):
+        return True
+
+    trace_file = trace_file or os.getenv(TRACE_FILE_ENV)
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        if trace_file:
+            exporter = FileSpanExporter(trace_file)
+        elif os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            exporter = OTLPSpanExporter()
+        else:
+            return False
+    except ImportError as e:
+        print(f"⚠️ Tracing disabled, OpenTelemetry SDK/exporter not installed: {e}")
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return True
+
+
+@contextlib.contextmanager
+def span(name: str, parent=None, **attributes):
+    """Start a span as the current one; `parent` is a context from `extract()`."""
+    if trace is None:
+        yield None
+        return
+    tracer = trace.get_tracer(TRACER_NAME)
+    with tracer.start_as_current_span(name, context=parent, attributes=attributes) as current:
+        yield current
+
+
+def inject(carrier: dict | None = None) -> dict:
+    """Add the current trace context (`traceparent`, `tracestate`) to `carrier`."""
+    carrier = {} if carrier is None else carrier
+    if trace is not None:
+        propagate.inject(carrier)
+    return carrier
+
+
+def extract(carrier):
+    """Trace context from HTTP headers or an MCP `_meta` dict, or None if it has none."""
+    if trace is None or not carrier or "traceparent" not in carrier:
+        return None
+    return propagate.extract(carrier)
+
+
+def flush():
+    # Short-lived processes (and frozen Lambda environments) lose batched spans otherwise.
+    if trace is not None:
+        provider = trace.get_tracer_provider()
+        if hasattr(provider, "force_flush"):
+            provider.force_flush()
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import statistics
+
+from histogram import LatencyHistogram
+
+OPERATIONS = ("connection", "initialize", "call_tool", "total")
+
+
+def parse_seconds(value: str) -> float:
+    """Parse "90", "90s", "15m" or "1h" into seconds."""
+    units = {"s": 1, "m": 60, "h": 3600}
+    value = value.strip()
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def format_gap(seconds: float) -> str:
+    if seconds >= 60 and seconds % 60 == 0:
+        return f"{seconds / 60:g}m"
+    return f"{seconds:g}s"
+
+
+def instance_metadata(text: str) -> dict | None:
+    """Instance metadata from a tool result: server_info output, or the Lambda's `instance` field."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    if "instance" in data:
+        return data["instance"]
+    return data if "instance_id" in data else None
+
+
+class ColdStartClassifier:
+    """Labels each probe cold or warm.
+
+    Response metadata wins when the server provides it: a probe is cold if the
+    server says it served its first call or the instance id changed since the
+    previous probe. Otherwise the timing signature decides: a probe is cold if
+    its total latency exceeds the warm baseline (median of back-to-back
+    probes) by more than `threshold` seconds or 5 MADs, whichever is larger.
+    """
+
+    def __init__(self, threshold: float = 0.2):
+        self.threshold = threshold
+        self.baseline = None
+        self.spread = 0.0
+        self._last_instance = None
+
+    def calibrate(self, totals: list[float]):
+        self.baseline = statistics.median(totals)
+        self.spread = statistics.median(abs(t - self.baseline) for t in totals)
+
+    def by_timing(self, total: float) -> bool | None:
+        if self.baseline is None:
+            return None
+        return total - self.baseline > max(self.threshold, 5 * self.spread)
+
+    def by_metadata(self, metadata: dict | None) -> bool | None:
+        if not metadata:
+            return None
+        instance = metadata.get("instance_id")
+        changed = self._last_instance is not None and instance != self._last_instance
+        self._last_instance = instance
+        return bool(metadata.get("cold_start")) or changed
+
+    def classify(self, total: float, metadata: dict | None) -> tuple[bool, str, bool | None]:
+        """Return (cold, source of the label, timing-based label)."""
+        timing = self.by_timing(total)
+        from_metadata = self.by_metadata(metadata)
+        if from_metadata is not None:
+            return from_metadata, "metadata", timing
+        return bool(timing), "timing", timing
+
+
+def new_gap_result(name: str, gap: float | None = None) -> dict:
+    return {
+        "name": name,
+        "gap": gap,
+        "probes": 0,
+        "cold": 0,
+        "errors": 0,
+        "latencies": {"cold": {}, "warm": {}},
+    }
+
+
+async def run_cold_start_sweep(
+    probe,
+    gaps: list[float],
+    probes: int,
+    baseline_probes: int,
+    threshold: float,
+    recorder=None,
+):
+    """Probe after each idle gap and report cold and warm latencies separately.
+
+    `probe()` opens a new MCP session, calls the tool once and returns
+    (times, instance metadata or None). The run starts with `baseline_probes`
+    back-to-back probes; the first of them is reported as the initial probe
+    and the rest calibrate the timing classifier. Then, for every gap, the
+    sweep sleeps for the gap before each of `probes` probes.
+    """
+    classifier = ColdStartClassifier(threshold)
+    results = []
+    agreement = {"agree": 0, "disagree": 0}
+
+    async def take(result: dict, phase: str):
+        result["probes"] += 1
+        try:
+            return await probe()
+        except Exception as e:
+            result["errors"] += 1
+            if recorder:
+                recorder.sample(phase, None, error=type(e).__name__)
+            print(f"  ❌ {phase}: {type(e).__name__}: {e}")
+            return None
+
+    def record(result: dict, phase: str, sample):
+        if sample is None:
+            return
+        times, metadata = sample
+        cold, source, timing = classifier.classify(times["total"], metadata)
+        if source == "metadata" and timing is not None:
+            agreement["agree" if timing == cold else "disagree"] += 1
+        label = "cold" if cold else "warm"
+        result["cold"] += cold
+        for operation in OPERATIONS:
+            if operation in times:
+                result["latencies"][label].setdefault(
+                    operation, LatencyHistogram()
+                ).record(times[operation])
+        if recorder:
+            recorder.sample(f"{phase}/{label}", times)
+        instance = f" instance={metadata.get('instance_id')}" if metadata else ""
+        print(
+            f"  {'🧊' if cold else '🔥'} {phase}: total {times['total'] * 1000:.2f}ms, "
+            f"call_tool {times.get('call_tool', 0) * 1000:.2f}ms ({label} by {source}){instance}"
+        )
+
+    print(f"\n⏱️ Baseline: {baseline_probes} back-to-back probes")
+    initial = new_gap_result("initial")
+    baseline = new_gap_result("baseline", 0.0)
+    samples = [(initial, "initial", await take(initial, "initial"))]
+    for _ in range(baseline_probes - 1):
+        samples.append((baseline, "baseline", await take(baseline, "baseline")))
+    totals = [sample[0]["total"] for _, _, sample in samples[1:] if sample]
+    if totals:
+        # Classified only now, so the initial probe is judged against the baseline too.
+        classifier.calibrate(totals)
+        print(
+            f"  Warm baseline: {classifier.baseline * 1000:.2f}ms "
+            f"(MAD {classifier.spread * 1000:.2f}ms)"
+        )
+    for result, phase, sample in samples:
+        record(result, phase, sample)
+    results += [initial, baseline]
+
+    for gap in gaps:
+        result = new_gap_result(format_gap(gap), gap)
+        print(f"\n💤 Idle gap {format_gap(gap)} x {probes}")
+        for _ in range(probes):
+            await asyncio.sleep(gap)
+            phase = f"gap={format_gap(gap)}"
+            record(result, phase, await take(result, phase))
+        results.append(result)
+
+    return results, agreement
+
+
+def format_ms(value: float | None) -> str:
+    return "-" if value is None else f"{value:.2f}"
+
+
+def print_cold_start_results(results: list[dict], agreement: dict):
+    print("\n" + "=" * 72)
+    print("🧊 COLD START SWEEP (total latency, ms)")
+    print("=" * 72)
+    totals = merge_by_label(results)
+    all_warm = totals["warm"].get("total")
+    # Penalties are relative to all warm probes, since a gap may have none.
+    warm_reference = all_warm.percentile(50) * 1000 if all_warm else None
+
+    print(f"{'gap':>9} {'probes':>7} {'cold':>5} {'cold%':>6} {'warm p50':>10} {'cold p50':>10} {'penalty':>9}")
+    for result in results:
+        warm = result["latencies"]["warm"].get("total")
+        cold = result["latencies"]["cold"].get("total")
+        warm_p50 = warm.percentile(50) * 1000 if warm else None
+        cold_p50 = cold.percentile(50) * 1000 if cold else None
+        penalty = cold_p50 - warm_reference if cold and warm_reference else None
+        ok = result["probes"] - result["errors"]
+        print(
+            f"{result['name']:>9} {result['probes']:>7} {result['cold']:>5} "
+            f"{(result['cold'] / ok * 100 if ok else 0):>5.0f}% "
+            f"{format_ms(warm_p50):>10} {format_ms(cold_p50):>10} {format_ms(penalty):>9}"
+        )
+
+    warm, cold = all_warm, totals["cold"].get("total")
+    if warm and cold:
+        print(
+            f"\n  Cold-start penalty (p50): {(cold.percentile(50) - warm.percentile(50)) * 1000:.2f}ms, "
+            f"(p90): {(cold.percentile(90) - warm.percentile(90)) * 1000:.2f}ms"
+        )
+    checked = agreement["agree"] + agreement["disagree"]
+    if checked:
+        print(
+            f"  Timing signature matched metadata in {agreement['agree']}/{checked} probes"
+        )
+
+
+def merge_by_label(results: list[dict]) -> dict:
+    merged = {"cold": {}, "warm": {}}
+    for result in results:
+        for label, histograms in result["latencies"].items():
+            for operation, histogram in histograms.items():
+                merged[label].setdefault(operation, LatencyHistogram()).merge(histogram)
+    return merged
@@ -0,0 +1,166 @@
+import argparse
+import math
+import random
+import sys
+
+from results import DROPPED, load_results
+
+STATISTICS = {"p50": 50, "p99": 99}
+
+
+def percentile(ordered: list, q: float) -> float:
+    rank = max(1, math.ceil(len(ordered) * q / 100))
+    return ordered[rank - 1]
+
+
+def group_samples(results: dict) -> dict:
+    groups = {}
+    for sample in results["samples"]:
+        if sample["error"]:
+            continue
+        for operation, value in sample["times"].items():
+            groups.setdefault(f"{sample['phase']}/{operation}", []).append(value)
+    return groups
+
+
+def error_rate(results: dict) -> float:
+    # Dropped open-loop arrivals are error samples too, so overload counts here.
+    samples = results["samples"]
+    if not samples:
+        return 0.0
+    return sum(1 for s in samples if s["error"]) / len(samples)
+
+
+def dropped(results: dict) -> int:
+    return sum(1 for s in results["samples"] if s["error"] == DROPPED)
+
+
+def bootstrap_ratio_ci(
+    baseline: list,
+    candidate: list,
+    q: float,
+    resamples: int,
+    confidence: float,
+    rng: random.Random,
+) -> tuple[float, float, float]:
+    """Relative change candidate/baseline - 1 of percentile q with a bootstrap CI."""
+    observed = percentile(sorted(candidate), q) / percentile(sorted(baseline), q) - 1
+    ratios = []
+    for _ in range(resamples):
+        b = sorted(rng.choices(baseline, k=len(baseline)))
+        c = sorted(rng.choices(candidate, k=len(candidate)))
+        ratios.append(percentile(c, q) / percentile(b, q) - 1)
+    ratios.sort()
+    alpha = (1 - confidence) / 2
+    lower = ratios[int(alpha * (resamples - 1))]
+    upper = ratios[int((1 - alpha) * (resamples - 1))]
+    return observed, lower, upper
+
+
+def compare(
+    baseline: dict,
+    candidate: dict,
+    operations: list[str],
+    threshold: float,
+    resamples: int,
+    confidence: float,
+    min_samples: int,
+    seed: int,
+) -> list[str]:
+    rng = random.Random(seed)
+    baseline_groups = group_samples(baseline)
+    candidate_groups = group_samples(candidate)
+    regressions = []
+
+    print(f"{'metric':<40} {'baseline':>10} {'candidate':>10} {'change':>8}  CI")
+    for key in sorted(baseline_groups.keys() & candidate_groups.keys()):
+        if operations and key.rsplit("/", 1)[-1] not in operations:
+            continue
+        b, c = baseline_groups[key], candidate_groups[key]
+        if min(len(b), len(c)) < min_samples:
+            print(f"{key:<40} skipped (fewer than {min_samples} samples)")
+            continue
+
+        for name, q in STATISTICS.items():
+            observed, lower, upper = bootstrap_ratio_ci(
+                b, c, q, resamples, confidence, rng
+            )
+            regressed = lower > threshold
+            marker = "❌" if regressed else "✅"
+            print(
+                f"{key + ' ' + name:<40} "
+                f"{percentile(sorted(b), q) * 1000:>8.2f}ms "
+                f"{percentile(sorted(c), q) * 1000:>8.2f}ms "
+                f"{observed * 100:>+7.1f}%  "
+                f"[{lower * 100:+.1f}%, {upper * 100:+.1f}%] {marker}"
+            )
+            if regressed:
+                regressions.append(f"{key} {name}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two measure_latency result files and fail on regression"
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--operations",
+        default="call_tool,total",
+        help="Comma-separated operations to compare (empty for all)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="Relative slowdown tolerated before the CI lower bound counts as a regression",
+    )
+    parser.add_argument(
+        "--max-error-rate-increase",
+        type=float,
+        default=0.01,
+        help="Absolute increase in error rate tolerated",
+    )
+    parser.add_argument("--resamples", type=int, default=2000)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--min-samples", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    operations = [o for o in args.operations.split(",") if o]
+
+    regressions = compare(
+        baseline,
+        candidate,
+        operations,
+        threshold=args.threshold,
+        resamples=args.resamples,
+        confidence=args.confidence,
+        min_samples=args.min_samples,
+        seed=args.seed,
+    )
+
+    baseline_errors, candidate_errors = error_rate(baseline), error_rate(candidate)
+    print(
+        f"\nError rate: {baseline_errors * 100:.2f}% -> {candidate_errors * 100:.2f}%"
+    )
+    if dropped(baseline) or dropped(candidate):
+        print(
+            "Dropped arrivals (max in-flight reached): "
+            f"{dropped(baseline)} -> {dropped(candidate)}"
+        )
+    if candidate_errors - baseline_errors > args.max_error_rate_increase:
+        regressions.append("error rate")
+
+    if regressions:
+        print(f"\n❌ Regression detected: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ No significant regression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import asyncio
+import random
+import time
+
+from histogram import LatencyHistogram
+from results import DROPPED
+
+
+def new_phase_result(name: str) -> dict:
+    return {
+        "name": name,
+        "started": 0,
+        "completed": 0,
+        "errors": 0,
+        "dropped": 0,
+        "error_types": {},
+        "latencies": {},
+        "elapsed": 0.0,
+    }
+
+
+async def run_and_record(run_once, result: dict, recorder=None):
+    result["started"] += 1
+    try:
+        times = await run_once()
+    except Exception as e:
+        result["errors"] += 1
+        error_type = type(e).__name__
+        result["error_types"][error_type] = result["error_types"].get(error_type, 0) + 1
+        if recorder:
+            recorder.sample(result["name"], None, error=error_type)
+        return
+
+    result["completed"] += 1
+    if recorder:
+        recorder.sample(result["name"], times)
+    for operation, value in times.items():
+        result["latencies"].setdefault(operation, LatencyHistogram()).record(value)
+
+
+async def run_closed_loop(
+    run_once, concurrency: int, duration: float, recorder=None
+) -> dict:
+    """Keep `concurrency` sessions busy back-to-back for `duration` seconds."""
+    result = new_phase_result(f"concurrency={concurrency}")
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await run_and_record(run_once, result, recorder)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+async def run_open_loop(
+    run_once,
+    rps: float,
+    duration: float,
+    max_in_flight: int = 256,
+    poisson: bool = False,
+    recorder=None,
+) -> dict:
+    """Start requests at a fixed arrival rate, independent of completions.
+
+    Arrivals that would exceed `max_in_flight` outstanding requests are counted
+    as dropped instead of queued, and recorded as `dropped` error samples, so a
+    saturated endpoint shows up as errors rather than as a silently lower
+    offered load.
+    """
+    result = new_phase_result(f"rps={rps:g}")
+    tasks = set()
+    start = time.perf_counter()
+    next_arrival = start
+
+    while next_arrival < start + duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if len(tasks) >= max_in_flight:
+            result["dropped"] += 1
+            if recorder:
+                recorder.sample(result["name"], None, error=DROPPED)
+        else:
+            task = asyncio.create_task(run_and_record(run_once, result, recorder))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        next_arrival += random.expovariate(rps) if poisson else 1 / rps
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def print_phase_results(result: dict):
+    attempted = result["started"] + result["dropped"]
+    failed = result["errors"] + result["dropped"]
+    throughput = result["completed"] / result["elapsed"] if result["elapsed"] else 0.0
+    error_rate = failed / attempted * 100 if attempted else 0.0
+
+    print(f"\n🚀 Phase {result['name']} ({result['elapsed']:.1f}s)")
+    print(f"  Requests:   {attempted} (completed {result['completed']})")
+    print(f"  Throughput: {throughput:.2f} req/s")
+    print(f"  Error rate: {error_rate:.2f}%")
+    if result["dropped"]:
+        print(f"  Dropped:    {result['dropped']} (max in-flight reached)")
+    for error_type, count in result["error_types"].items():
+        print(f"    {error_type}: {count}")
+
+    for operation, histogram in result["latencies"].items():
+        print(
+            f"  {operation:<11} "
+            f"p50={histogram.percentile(50) * 1000:.2f}ms "
+            f"p90={histogram.percentile(90) * 1000:.2f}ms "
+            f"p99={histogram.percentile(99) * 1000:.2f}ms "
+            f"p99.9={histogram.percentile(99.9) * 1000:.2f}ms "
+            f"max={histogram.max * 1000:.2f}ms"
+        )
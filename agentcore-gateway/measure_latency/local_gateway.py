@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import json
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import uvicorn
+from mcp import types
+from mcp.server.lowlevel import Server
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+SEARCH_TOOL_NAME = "x_amz_bedrock_agentcore_search"
+TOOL_NAME_DELIMITER = "___"
+# W3C trace context keys a client may send in a tool call's _meta.
+TRACE_CONTEXT_KEYS = ("traceparent", "tracestate")
+# Synchronous Lambda invocations accept and return at most 6MB each.
+LAMBDA_PAYLOAD_LIMIT_MB = 6.0
+
+
+class LatencyProfile:
+    """Injected delay applied before each in-process Lambda invocation.
+
+    `latency_ms` +/- `jitter_ms` (uniform) stands in for the Gateway and Lambda
+    invoke overhead. After `idle_timeout` seconds without calls the next call
+    additionally pays `cold_start_ms` and `cold` is set, mimicking a recycled
+    execution environment.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        cold_start_ms: float = 0.0,
+        idle_timeout: float = 600.0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.cold_start_ms = cold_start_ms
+        self.idle_timeout = idle_timeout
+        self.cold = False
+        self._last_call = None
+
+    def next_delay(self) -> float:
+        now = time.monotonic()
+        self.cold = self._last_call is None or now - self._last_call > self.idle_timeout
+        self._last_call = now
+
+        delay_ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if self.cold:
+            delay_ms += self.cold_start_ms
+        return max(delay_ms, 0.0) / 1000
+
+
+class LambdaContext:
+    def __init__(
+        self, function_name: str, tool_name: str, timeout: float, trace_context: dict
+    ):
+        self.function_name = function_name
+        self.aws_request_id = str(uuid.uuid4())
+        self.client_context = type(
+            "ClientContext",
+            (),
+            {"custom": {"bedrockAgentCoreToolName": tool_name, **trace_context}},
+        )()
+        self._deadline = time.monotonic() + timeout
+
+    def get_remaining_time_in_millis(self) -> int:
+        return max(int((self._deadline - time.monotonic()) * 1000), 0)
+
+
+def load_lambda_handler(lambda_dir: Path):
+    # Like the Lambda runtime, let index.py import its sibling modules.
+    if str(lambda_dir.resolve()) not in sys.path:
+        sys.path.insert(0, str(lambda_dir.resolve()))
+    spec = importlib.util.spec_from_file_location("index", lambda_dir / "index.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+def load_tool_schemas(schema_path: Path) -> list[dict]:
+    schemas = json.loads(schema_path.read_text())
+    return schemas if isinstance(schemas, list) else [schemas]
+
+
+def request_trace_context(server: Server) -> dict:
+    """traceparent/tracestate from the request's _meta, to hand to the Lambda like a propagating Gateway would."""
+    meta = server.request_context.meta
+    extra = meta.model_dump() if meta else {}
+    return {key: extra[key] for key in TRACE_CONTEXT_KEYS if key in extra}
+
+
+def check_payload_size(kind: str, payload, limit: int | None) -> str:
+    body = json.dumps(payload, ensure_ascii=False)
+    if limit and len(body.encode()) > limit:
+        raise ValueError(
+            f"Lambda {kind} payload of {len(body.encode())} bytes exceeds the limit of {limit} bytes"
+        )
+    return body
+
+
+def create_server(
+    load_handler,
+    schemas: list[dict],
+    target_name: str,
+    profile: LatencyProfile,
+    payload_limit: int | None = None,
+) -> Server:
+    server = Server("local-agentcore-gateway")
+    handler = load_handler()
+    first_call = True
+    tools = {
+        f"{target_name}{TOOL_NAME_DELIMITER}{schema['name']}": types.Tool(
+            name=f"{target_name}{TOOL_NAME_DELIMITER}{schema['name']}",
+            description=schema.get("description"),
+            inputSchema=schema["inputSchema"],
+        )
+        for schema in schemas
+    }
+    search_tool = types.Tool(
+        name=SEARCH_TOOL_NAME,
+        description="A special tool that returns a trimmed down list of tools given a context.",
+        inputSchema={
+            "type": "object",
+            "properties": {"query": {"type": "string"}},
+            "required": ["query"],
+        },
+    )
+
+    @server.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        # The Gateway lists its built-in search tool first when semantic search is enabled.
+        return [search_tool, *tools.values()]
+
+    @server.call_tool()
+    async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
+        nonlocal handler, first_call
+        if name == SEARCH_TOOL_NAME:
+            words = arguments["query"].lower().split()
+            matches = [
+                tool.model_dump(exclude_none=True)
+                for tool in tools.values()
+                if any(w in f"{tool.name} {tool.description}".lower() for w in words)
+            ]
+            return [types.TextContent(type="text", text=json.dumps({"tools": matches}))]
+
+        if name not in tools:
+            raise ValueError(f"Unknown tool: {name}")
+
+        check_payload_size("request", arguments, payload_limit)
+        await asyncio.sleep(profile.next_delay())
+        if profile.cold and not first_call:
+            # A recycled environment re-runs the module's init code.
+            handler = load_handler()
+        first_call = False
+        context = LambdaContext(
+            target_name, name, timeout=600, trace_context=request_trace_context(server)
+        )
+        result = await asyncio.to_thread(handler, arguments, context)
+        body = check_payload_size("response", result, payload_limit)
+        return [types.TextContent(type="text", text=body)]
+
+    return server
+
+
+class StreamableHTTPApp:
+    def __init__(self, session_manager: StreamableHTTPSessionManager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope, receive, send):
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+def create_app(server: Server) -> Starlette:
+    session_manager = StreamableHTTPSessionManager(app=server, stateless=True)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with session_manager.run():
+            yield
+
+    return Starlette(
+        routes=[Route("/mcp", endpoint=StreamableHTTPApp(session_manager))],
+        lifespan=lifespan,
+    )
+
+
+def parse_args():
+    base_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(
+        description="Serve test_lambda over MCP streamable-http as a local stand-in for AgentCore Gateway"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--lambda-dir", type=Path, default=base_dir / "test_lambda")
+    parser.add_argument("--schema", type=Path, help="Defaults to <lambda-dir>/inline_schema.json")
+    parser.add_argument("--target-name", default="test-lambda-target")
+    parser.add_argument(
+        "--latency-ms", type=float, default=0.0, help="Delay added to every tool call"
+    )
+    parser.add_argument(
+        "--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the delay"
+    )
+    parser.add_argument(
+        "--cold-start-ms",
+        type=float,
+        default=0.0,
+        help="Extra delay for the first call and calls after --idle-timeout",
+    )
+    parser.add_argument("--idle-timeout", type=float, default=600.0)
+    parser.add_argument(
+        "--payload-limit-mb",
+        type=float,
+        default=LAMBDA_PAYLOAD_LIMIT_MB,
+        help="Reject Lambda requests and responses larger than this, like Lambda does (0: no limit)",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    schemas = load_tool_schemas(args.schema or args.lambda_dir / "inline_schema.json")
+    profile = LatencyProfile(
+        args.latency_ms, args.jitter_ms, args.cold_start_ms, args.idle_timeout
+    )
+
+    server = create_server(
+        lambda: load_lambda_handler(args.lambda_dir),
+        schemas,
+        args.target_name,
+        profile,
+        payload_limit=int(args.payload_limit_mb * 1024 * 1024),
+    )
+    uvicorn.run(create_app(server), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
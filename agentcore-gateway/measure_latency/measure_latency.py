@@ -1,35 +1,53 @@
+import argparse
 import asyncio
+import json
 import os
 import time
-from statistics import mean, median, stdev
 
-from bedrock_agentcore.identity.auth import requires_access_token
 from dotenv import load_dotenv
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
+from coldstart import (
+    instance_metadata,
+    merge_by_label,
+    parse_seconds,
+    print_cold_start_results,
+    run_cold_start_sweep,
+)
+from histogram import LatencyHistogram, save_histograms
+from load_test import print_phase_results, run_closed_loop, run_open_loop
+from results import ResultRecorder
+from token_provider import TokenProvider
+from tool_cache import ToolCache
+from tracing import flush, inject, setup_tracing, span
+
 load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
 
 
-@requires_access_token(
+token_provider = TokenProvider(
     provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
     scopes=[
         os.getenv("OAUTH2_SCOPE_READ"),
         os.getenv("OAUTH2_SCOPE_WRITE"),
     ],
-    auth_flow="M2M",
 )
-async def get_access_token(*, access_token: str) -> str:
-    return access_token
 
 
-def validate_env_vars():
-    required = [
-        "GATEWAY_ENDPOINT_URL",
-        "OAUTH2_PROVIDER_NAME",
-        "OAUTH2_SCOPE_READ",
-        "OAUTH2_SCOPE_WRITE",
-    ]
+async def get_access_token() -> str:
+    return await token_provider.get_token()
+
+
+async def no_access_token() -> str:
+    return ""
+
+
+def validate_env_vars(endpoint: bool = True, auth: bool = True):
+    required = []
+    if endpoint:
+        required.append("GATEWAY_ENDPOINT_URL")
+    if auth:
+        required += ["OAUTH2_PROVIDER_NAME", "OAUTH2_SCOPE_READ", "OAUTH2_SCOPE_WRITE"]
     missing = [var for var in required if not os.getenv(var)]
     if missing:
         raise ValueError(
@@ -37,11 +55,37 @@ def validate_env_vars():
         )
 
 
+def auth_headers(access_token: str) -> dict:
+    return {"Authorization": f"Bearer {access_token}"} if access_token else {}
+
+
+class ToolCallError(RuntimeError):
+    """The tool call returned, but its result reports a failure."""
+
+
+def check_tool_result(result):
+    # A failed call still has a latency; raise so it counts as an error, not a sample.
+    if result is None:
+        return
+    text = "".join(c.text for c in result.content if c.type == "text")
+    if result.isError:
+        raise ToolCallError(text[:200] or "tool returned an error")
+    # The Gateway passes the Lambda response through, error status included.
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return
+    status = data.get("statusCode") if isinstance(data, dict) else None
+    if isinstance(status, int) and status >= 400:
+        raise ToolCallError(str(data.get("body"))[:200])
+
+
 def print_iteration_results(iteration: int, total: int, times: dict):
     print(f"\n📊 Iteration {iteration}/{total}")
     print(f"  Connection: {times['connection'] * 1000:.2f}ms")
     print(f"  Initialize: {times['initialize'] * 1000:.2f}ms")
-    print(f"  List Tools: {times['list_tools'] * 1000:.2f}ms")
+    if "list_tools" in times:
+        print(f"  List Tools: {times['list_tools'] * 1000:.2f}ms")
     if times.get("call_tool"):
         print(f"  Call Tool:  {times['call_tool'] * 1000:.2f}ms")
     print(f"  Total: {times['total'] * 1000:.2f}ms")
@@ -52,53 +96,81 @@ def print_statistics(latencies: dict):
     print("📈 LATENCY STATISTICS (ms)")
     print("=" * 50)
 
-    for operation, times in latencies.items():
-        times_ms = [t * 1000 for t in times]
+    for operation, histogram in latencies.items():
+        if not histogram.count:
+            continue
         print(f"\n{operation.upper()}:")
-        print(f"  Mean:   {mean(times_ms):.2f}ms")
-        print(f"  Median: {median(times_ms):.2f}ms")
-        print(f"  Min:    {min(times_ms):.2f}ms")
-        print(f"  Max:    {max(times_ms):.2f}ms")
-        if len(times_ms) > 1:
-            print(f"  StdDev: {stdev(times_ms):.2f}ms")
+        print(f"  Count:  {histogram.count}")
+        print(f"  Mean:   {histogram.mean() * 1000:.2f}ms")
+        print(f"  p50:    {histogram.percentile(50) * 1000:.2f}ms")
+        print(f"  p90:    {histogram.percentile(90) * 1000:.2f}ms")
+        print(f"  p99:    {histogram.percentile(99) * 1000:.2f}ms")
+        print(f"  p99.9:  {histogram.percentile(99.9) * 1000:.2f}ms")
+        print(f"  Min:    {histogram.min * 1000:.2f}ms")
+        print(f"  Max:    {histogram.max * 1000:.2f}ms")
+        if histogram.count > 1:
+            print(f"  StdDev: {histogram.stdev() * 1000:.2f}ms")
 
 
 async def run_mcp_operations(
-    session: ClientSession, test_args: dict, tool_index: int = 0
+    session: ClientSession,
+    test_args: dict,
+    tool_index: int = 0,
+    tool_name: str | None = None,
 ):
     times = {}
+    result = None
 
-    start = time.perf_counter()
-    await session.initialize()
-    times["initialize"] = time.perf_counter() - start
+    with span("mcp.initialize"):
+        start = time.perf_counter()
+        await session.initialize()
+        times["initialize"] = time.perf_counter() - start
 
-    start = time.perf_counter()
-    tools = await session.list_tools()
-    times["list_tools"] = time.perf_counter() - start
+    # With a cached tool name, tools/list is skipped as a client with a tool cache would.
+    if tool_name is None:
+        with span("mcp.list_tools"):
+            start = time.perf_counter()
+            tools = await session.list_tools()
+            times["list_tools"] = time.perf_counter() - start
+        if tools.tools and len(tools.tools) > tool_index:
+            tool_name = tools.tools[tool_index].name
 
-    if tools.tools and len(tools.tools) > tool_index:
-        start = time.perf_counter()
-        await session.call_tool(tools.tools[tool_index].name, arguments=test_args)
-        times["call_tool"] = time.perf_counter() - start
+    if tool_name:
+        with span("mcp.call_tool", **{"mcp.tool.name": tool_name}):
+            start = time.perf_counter()
+            # The trace context also rides in _meta, so the server can parent
+            # its spans to this call rather than to the whole session.
+            result = await session.call_tool(tool_name, arguments=test_args, meta=inject())
+            times["call_tool"] = time.perf_counter() - start
 
-    return times
+    return times, result
 
 
 async def run_single_iteration(
-    endpoint: str, access_token: str, test_args: dict, tool_index: int = 0
+    endpoint: str,
+    access_token: str,
+    test_args: dict,
+    tool_index: int = 0,
+    tool_name: str | None = None,
 ):
-    headers = {"Authorization": f"Bearer {access_token}"}
+    with span("mcp.session", **{"server.address": endpoint}):
+        # Headers are fixed per connection, so they carry the session span.
+        headers = inject(auth_headers(access_token))
 
-    start_total = time.perf_counter()
+        start_total = time.perf_counter()
 
-    async with streamablehttp_client(
-        endpoint, headers, timeout=120, terminate_on_close=False
-    ) as (read_stream, write_stream, _):
-        conn_time = time.perf_counter() - start_total
+        async with streamablehttp_client(
+            endpoint, headers, timeout=120, terminate_on_close=False
+        ) as (read_stream, write_stream, _):
+            conn_time = time.perf_counter() - start_total
 
-        async with ClientSession(read_stream, write_stream) as session:
-            operation_times = await run_mcp_operations(session, test_args, tool_index)
+            async with ClientSession(read_stream, write_stream) as session:
+                operation_times, result = await run_mcp_operations(
+                    session, test_args, tool_index, tool_name
+                )
 
+    # Checked after the session closes, so the error is not wrapped by its task group.
+    check_tool_result(result)
     return {
         "connection": conn_time,
         "total": time.perf_counter() - start_total,
@@ -106,49 +178,539 @@ async def run_single_iteration(
     }
 
 
-async def measure_latency(
+async def run_session_reuse(
     endpoint: str,
     access_token: str,
+    test_args: dict,
+    calls: int,
+    pipeline: int = 1,
+    tool_index: int = 0,
+    tool_name: str | None = None,
+):
+    setup = {}
+    call_times = []
+    errors = []
+
+    with span("mcp.session", **{"server.address": endpoint}):
+        headers = inject(auth_headers(access_token))
+
+        start_total = time.perf_counter()
+
+        async with streamablehttp_client(
+            endpoint, headers, timeout=120, terminate_on_close=False
+        ) as (read_stream, write_stream, _):
+            setup["connection"] = time.perf_counter() - start_total
+
+            async with ClientSession(read_stream, write_stream) as session:
+                with span("mcp.initialize"):
+                    start = time.perf_counter()
+                    await session.initialize()
+                    setup["initialize"] = time.perf_counter() - start
+
+                if tool_name is None:
+                    with span("mcp.list_tools"):
+                        start = time.perf_counter()
+                        tools = await session.list_tools()
+                        setup["list_tools"] = time.perf_counter() - start
+                    tool_name = tools.tools[tool_index].name
+                setup["setup_total"] = time.perf_counter() - start_total
+
+                semaphore = asyncio.Semaphore(pipeline)
+
+                async def timed_call():
+                    async with semaphore:
+                        with span("mcp.call_tool", **{"mcp.tool.name": tool_name}):
+                            start = time.perf_counter()
+                            try:
+                                result = await session.call_tool(
+                                    tool_name, arguments=test_args, meta=inject()
+                                )
+                                check_tool_result(result)
+                            except Exception as e:
+                                # Counted per call, so one failure keeps the session's other samples.
+                                errors.append(type(e).__name__)
+                                print(f"  ❌ call_tool: {type(e).__name__}: {e}")
+                                return
+                            call_times.append(time.perf_counter() - start)
+
+                start_calls = time.perf_counter()
+                await asyncio.gather(*(timed_call() for _ in range(calls)))
+                calls_elapsed = time.perf_counter() - start_calls
+
+    return setup, call_times, errors, calls_elapsed
+
+
+async def measure_session_reuse(
+    endpoint: str,
+    get_token,
+    test_args: dict,
+    sessions: int,
+    calls: int,
+    pipeline: int,
+    tool_index: int = 0,
+    tool_name: str | None = None,
+    recorder: ResultRecorder | None = None,
+):
+    setup_latencies = {
+        operation: LatencyHistogram()
+        for operation in ("connection", "initialize", "list_tools", "setup_total")
+    }
+    call_latencies = {
+        "first_call": LatencyHistogram(),
+        "steady_call": LatencyHistogram(),
+    }
+    total_calls = 0
+    total_errors = 0
+    total_elapsed = 0.0
+
+    for i in range(sessions):
+        setup, call_times, errors, calls_elapsed = await run_session_reuse(
+            endpoint,
+            await get_token(),
+            test_args,
+            calls,
+            pipeline,
+            tool_index,
+            tool_name,
+        )
+        for operation, value in setup.items():
+            setup_latencies[operation].record(value)
+        if call_times:
+            call_latencies["first_call"].record(call_times[0])
+            for call_time in call_times[1:]:
+                call_latencies["steady_call"].record(call_time)
+        if recorder:
+            recorder.sample("session", setup)
+            for n, call_time in enumerate(call_times):
+                operation = "first_call" if n == 0 else "steady_call"
+                recorder.sample("session", {operation: call_time})
+            for error in errors:
+                recorder.sample("session", None, error=error)
+        total_calls += len(call_times)
+        total_errors += len(errors)
+        total_elapsed += calls_elapsed
+
+        print(
+            f"\n🔁 Session {i + 1}/{sessions}: setup "
+            f"{setup['setup_total'] * 1000:.2f}ms, {len(call_times)} calls in "
+            f"{calls_elapsed * 1000:.2f}ms (pipeline={pipeline}, {len(errors)} failed)"
+        )
+
+    print("\n🧊 COLD SESSION SETUP")
+    print_statistics(setup_latencies)
+    print("\n🔥 STEADY-STATE CALL_TOOL")
+    print_statistics(call_latencies)
+    if total_elapsed:
+        print(f"\n  Throughput: {total_calls / total_elapsed:.2f} calls/s per session")
+    if total_errors:
+        print(
+            f"\n❌ Failed tool calls: {total_errors}/{total_calls + total_errors} "
+            "(not in the statistics)"
+        )
+
+    return {**setup_latencies, **call_latencies}
+
+
+async def measure_latency(
+    endpoint: str,
+    get_token,
     iterations: int,
     test_args: dict,
     tool_index: int = 0,
+    tool_name: str | None = None,
+    interval: float = 2.0,
+    recorder: ResultRecorder | None = None,
 ):
     latencies = {
-        "connection": [],
-        "initialize": [],
-        "list_tools": [],
-        "call_tool": [],
-        "total": [],
+        operation: LatencyHistogram()
+        for operation in ("connection", "initialize", "list_tools", "call_tool", "total")
     }
 
-    for i in range(iterations):
-        times = await run_single_iteration(
-            endpoint, access_token, test_args, tool_index
-        )
+    errors = 0
 
-        latencies["connection"].append(times["connection"])
-        latencies["initialize"].append(times["initialize"])
-        latencies["list_tools"].append(times["list_tools"])
-        latencies["total"].append(times["total"])
+    for i in range(iterations):
+        try:
+            times = await run_single_iteration(
+                endpoint, await get_token(), test_args, tool_index, tool_name
+            )
+        except ToolCallError as e:
+            errors += 1
+            if recorder:
+                recorder.sample("serial", None, error=type(e).__name__)
+            print(f"\n❌ Iteration {i + 1}/{iterations}: {e}")
+            await asyncio.sleep(interval)
+            continue
+
+        latencies["connection"].record(times["connection"])
+        latencies["initialize"].record(times["initialize"])
+        if "list_tools" in times:
+            latencies["list_tools"].record(times["list_tools"])
+        latencies["total"].record(times["total"])
         if times.get("call_tool"):
-            latencies["call_tool"].append(times["call_tool"])
+            latencies["call_tool"].record(times["call_tool"])
 
+        if recorder:
+            recorder.sample("serial", times)
         print_iteration_results(i + 1, iterations, times)
-        time.sleep(2)
+        await asyncio.sleep(interval)
 
     print_statistics(latencies)
+    if errors:
+        print(f"\n❌ Failed tool calls: {errors}/{iterations} (not in the statistics)")
+    return latencies
 
 
-async def main():
-    validate_env_vars()
+async def measure_load(
+    endpoint: str,
+    get_token,
+    test_args: dict,
+    tool_index: int,
+    tool_name: str | None,
+    concurrency: list[int] | None,
+    rps: list[float] | None,
+    duration: float,
+    max_in_flight: int,
+    poisson: bool,
+    recorder: ResultRecorder | None = None,
+):
+    async def run_once():
+        return await run_single_iteration(
+            endpoint, await get_token(), test_args, tool_index, tool_name
+        )
 
-    access_token = await get_access_token(access_token="")
-    mcp_endpoint = os.getenv("GATEWAY_ENDPOINT_URL", "")
-    test_args = {"name": "Jack"}
+    results = []
+    for sessions in concurrency or []:
+        result = await run_closed_loop(run_once, sessions, duration, recorder)
+        print_phase_results(result)
+        results.append(result)
+
+    for rate in rps or []:
+        result = await run_open_loop(
+            run_once, rate, duration, max_in_flight, poisson, recorder
+        )
+        print_phase_results(result)
+        results.append(result)
+
+    return {
+        f"{result['name']}/{operation}": histogram
+        for result in results
+        for operation, histogram in result["latencies"].items()
+    }
 
-    await measure_latency(
-        mcp_endpoint, access_token, iterations=50, test_args=test_args, tool_index=1
+
+async def run_cold_probe(
+    endpoint: str, access_token: str, test_args: dict, tool_name: str
+):
+    """One new session calling the tool once; returns (times, instance metadata)."""
+    times = {}
+
+    with span("mcp.session", **{"server.address": endpoint, "probe": "coldstart"}):
+        headers = inject(auth_headers(access_token))
+
+        start_total = time.perf_counter()
+        async with streamablehttp_client(
+            endpoint, headers, timeout=120, terminate_on_close=False
+        ) as (read_stream, write_stream, _):
+            times["connection"] = time.perf_counter() - start_total
+
+            async with ClientSession(read_stream, write_stream) as session:
+                with span("mcp.initialize"):
+                    start = time.perf_counter()
+                    await session.initialize()
+                    times["initialize"] = time.perf_counter() - start
+
+                with span("mcp.call_tool", **{"mcp.tool.name": tool_name}):
+                    start = time.perf_counter()
+                    result = await session.call_tool(
+                        tool_name, arguments=test_args, meta=inject()
+                    )
+                    times["call_tool"] = time.perf_counter() - start
+        times["total"] = time.perf_counter() - start_total
+
+    # A failed probe is counted as an error, not classified as cold or warm.
+    check_tool_result(result)
+    # test_lambda adds the execution environment's metadata to its response.
+    text = "".join(c.text for c in result.content if c.type == "text")
+    return times, instance_metadata(text)
+
+
+async def measure_cold_start(
+    endpoint: str,
+    get_token,
+    test_args: dict,
+    tool_name: str,
+    gaps: list[float],
+    probes: int,
+    baseline_probes: int,
+    threshold: float,
+    recorder: ResultRecorder | None = None,
+):
+    async def probe():
+        return await run_cold_probe(endpoint, await get_token(), test_args, tool_name)
+
+    minutes = sum(gaps) * probes / 60
+    print(f"🧊 Cold-start sweep over idle gaps {gaps}s, about {minutes:.0f} min")
+    results, agreement = await run_cold_start_sweep(
+        probe, gaps, probes, baseline_probes, threshold, recorder
+    )
+    print_cold_start_results(results, agreement)
+    return {
+        f"{label}/{operation}": histogram
+        for label, histograms in merge_by_label(results).items()
+        for operation, histogram in histograms.items()
+    }
+
+
+async def fetch_tools(endpoint: str, access_token: str) -> list:
+    async with streamablehttp_client(
+        endpoint, auth_headers(access_token), timeout=120, terminate_on_close=False
+    ) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            return (await session.list_tools()).tools
+
+
+async def resolve_cached_tool(
+    tool_cache: ToolCache, endpoint: str, get_token, tool_index: int = 0
+) -> str:
+    """Tool name to call, from the tool cache; fetched (outside the measurement) on a miss."""
+    tools = tool_cache.load()
+    if tools is None or tool_cache.stale:
+        tools = await fetch_tools(endpoint, await get_token())
+        tool_cache.update(tools)
+    else:
+        print(f"📦 Using cached tool list (version {tool_cache.version})")
+    return tools[tool_index].name
+
+
+async def refresh_tool_cache(tool_cache: ToolCache, endpoint: str, get_token):
+    try:
+        previous_version = tool_cache.version
+        if tool_cache.update(await fetch_tools(endpoint, await get_token())):
+            print(
+                f"\n♻️ Tool schemas changed ({previous_version} -> {tool_cache.version}); "
+                "cache updated, re-run if the measured tool was affected"
+            )
+    except Exception as e:
+        print(f"\n⚠️ Tool list refresh failed: {e}")
+
+
+OUTPUT_OPERATIONS = {
+    "serial": ["connection", "initialize", "list_tools", "call_tool", "total"],
+    "load": ["connection", "initialize", "list_tools", "call_tool", "total"],
+    "session": [
+        "connection",
+        "initialize",
+        "list_tools",
+        "setup_total",
+        "first_call",
+        "steady_call",
+    ],
+    "coldstart": ["connection", "initialize", "call_tool", "total"],
+}
+
+
+def parse_list(cast):
+    def parse(value: str):
+        return [cast(v) for v in value.split(",") if v]
+
+    return parse
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure latency of the MCP server behind AgentCore Gateway"
+    )
+    parser.add_argument(
+        "--endpoint",
+        help="MCP endpoint URL, e.g. a local server (defaults to GATEWAY_ENDPOINT_URL)",
+    )
+    parser.add_argument(
+        "--no-auth",
+        action="store_true",
+        help="Do not fetch an access token (for local servers)",
+    )
+    parser.add_argument(
+        "--mode", choices=["serial", "load", "session", "coldstart"], default="serial"
+    )
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Seconds to wait between serial iterations",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=parse_list(int),
+        help="Closed-loop phases: comma-separated concurrent sessions, e.g. 1,5,10",
+    )
+    parser.add_argument(
+        "--rps",
+        type=parse_list(float),
+        help="Open-loop phases: comma-separated arrival rates (req/s), e.g. 0.5,1,2",
     )
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="Seconds per load phase"
+    )
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument(
+        "--arrival",
+        choices=["uniform", "poisson"],
+        default="uniform",
+        help="Inter-arrival distribution for open-loop phases",
+    )
+    parser.add_argument(
+        "--sessions", type=int, default=1, help="Sessions to open in session mode"
+    )
+    parser.add_argument(
+        "--calls", type=int, default=50, help="call_tool invocations per session"
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=int,
+        default=1,
+        help="call_tool requests kept in flight concurrently on one session",
+    )
+    parser.add_argument(
+        "--idle-gaps",
+        type=parse_list(parse_seconds),
+        default="0,30s,1m,5m,10m,15m",
+        help="Cold-start mode: comma-separated idle gaps before each probe (s, m or h suffix)",
+    )
+    parser.add_argument(
+        "--probes", type=int, default=3, help="Cold-start mode: probes per idle gap"
+    )
+    parser.add_argument(
+        "--baseline-probes",
+        type=int,
+        default=5,
+        help="Cold-start mode: back-to-back probes that calibrate the warm baseline",
+    )
+    parser.add_argument(
+        "--cold-threshold-ms",
+        type=float,
+        default=200.0,
+        help="Cold-start mode: minimum excess over the warm baseline to count a probe as cold by timing",
+    )
+    parser.add_argument(
+        "--tool-cache",
+        action="store_true",
+        help="Take the tool from the persistent tool-list cache and skip tools/list in each iteration",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="PATH",
+        help="Write per-sample results and a summary (.jsonl, or .csv with a .summary.json sidecar)",
+    )
+    parser.add_argument(
+        "--trace-file",
+        metavar="PATH",
+        help="Export OpenTelemetry spans of each phase to a JSON Lines file "
+        "(or set OTEL_EXPORTER_OTLP_ENDPOINT)",
+    )
+    parser.add_argument(
+        "--save-histograms",
+        metavar="PATH",
+        help="Save latency histograms as JSON (merge runs with histogram.py)",
+    )
+    args = parser.parse_args()
+    if args.mode == "load" and not (args.concurrency or args.rps):
+        parser.error("--mode load requires --concurrency and/or --rps")
+    if args.rps and any(rate <= 0 for rate in args.rps):
+        parser.error("--rps rates must be positive")
+    return args
+
+
+async def main():
+    args = parse_args()
+    validate_env_vars(endpoint=not args.endpoint, auth=not args.no_auth)
+    setup_tracing("measure-latency", args.trace_file)
+
+    if args.no_auth:
+        get_token = no_access_token
+    else:
+        get_token = get_access_token
+        await get_access_token()
+        token_provider.start_background_refresh()
+    mcp_endpoint = args.endpoint or os.getenv("GATEWAY_ENDPOINT_URL", "")
+    test_args = {"name": "Jack"}
+
+    tool_cache = ToolCache(mcp_endpoint) if args.tool_cache else None
+    tool_name = None
+    if tool_cache:
+        tool_name = await resolve_cached_tool(
+            tool_cache, mcp_endpoint, get_token, tool_index=1
+        )
+
+    recorder = None
+    if args.output:
+        recorder = ResultRecorder(
+            args.output, mcp_endpoint, vars(args), OUTPUT_OPERATIONS[args.mode]
+        )
+
+    if args.mode == "load":
+        latencies = await measure_load(
+            mcp_endpoint,
+            get_token,
+            test_args,
+            tool_index=1,
+            tool_name=tool_name,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            duration=args.duration,
+            max_in_flight=args.max_in_flight,
+            poisson=args.arrival == "poisson",
+            recorder=recorder,
+        )
+    elif args.mode == "coldstart":
+        if tool_name is None:
+            tools = await fetch_tools(mcp_endpoint, await get_token())
+            tool_name = tools[1].name
+        latencies = await measure_cold_start(
+            mcp_endpoint,
+            get_token,
+            test_args,
+            tool_name,
+            gaps=args.idle_gaps,
+            probes=args.probes,
+            baseline_probes=args.baseline_probes,
+            threshold=args.cold_threshold_ms / 1000,
+            recorder=recorder,
+        )
+    elif args.mode == "session":
+        latencies = await measure_session_reuse(
+            mcp_endpoint,
+            get_token,
+            test_args,
+            sessions=args.sessions,
+            calls=args.calls,
+            pipeline=args.pipeline,
+            tool_name=tool_name,
+            recorder=recorder,
+            tool_index=1,
+        )
+    else:
+        latencies = await measure_latency(
+            mcp_endpoint,
+            get_token,
+            iterations=args.iterations,
+            test_args=test_args,
+            tool_index=1,
+            tool_name=tool_name,
+            interval=args.interval,
+            recorder=recorder,
+        )
+
+    if tool_cache:
+        # Checked after measuring so the refresh does not overlap with samples.
+        await refresh_tool_cache(tool_cache, mcp_endpoint, get_token)
+    if recorder:
+        recorder.close(latencies)
+    if args.save_histograms:
+        save_histograms(args.save_histograms, latencies)
+    await token_provider.stop_background_refresh()
+    flush()
 
 
 if __name__ == "__main__":
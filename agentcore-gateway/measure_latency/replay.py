@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from histogram import LatencyHistogram
+from measure_latency import (
+    auth_headers,
+    get_access_token,
+    no_access_token,
+    token_provider,
+    validate_env_vars,
+)
+from results import environment_metadata
+
+# Gateway prefixes tool names with the target name: "<target>___<tool>".
+TARGET_SEPARATOR = "___"
+REPLAYED_METHODS = ("initialize", "tools/list", "tools/call")
+
+
+def load_records(path: str, tools: list[str] | None) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records = [r for r in records if r["method"] in REPLAYED_METHODS]
+    if tools:
+        records = [
+            r
+            for r in records
+            if r["method"] != "tools/call" or base_name(r["tool"]) in tools
+        ]
+    return sorted(records, key=lambda r: r["t"])
+
+
+def base_name(tool_name: str) -> str:
+    return tool_name.split(TARGET_SEPARATOR)[-1]
+
+
+def schedule(records: list[dict], speed: float, max_gap: float | None) -> list[float]:
+    """Replay offsets (seconds from the start): recorded gaps / `speed`, capped at `max_gap`."""
+    offsets = []
+    offset = 0.0
+    previous = records[0]["t"] if records else 0.0
+    for record in records:
+        gap = (record["t"] - previous) / speed
+        if max_gap is not None:
+            gap = min(gap, max_gap)
+        offset += gap
+        offsets.append(offset)
+        previous = record["t"]
+    return offsets
+
+
+def operation(record: dict) -> str:
+    if record["method"] == "tools/call":
+        return f"tools/call {base_name(record['tool'])}"
+    return record["method"]
+
+
+def new_result() -> dict:
+    return {"calls": 0, "errors": 0, "error_types": {}, "latency": LatencyHistogram()}
+
+
+class Replayer:
+    """Replays recorded sessions against an endpoint on the recorded timeline.
+
+    Each recorded session gets its own MCP session, opened when its first
+    request is due. Requests are sent at their scheduled offset, so sessions
+    overlap as they did when recorded. Tool names are matched by the part
+    after the Gateway's "<target>___" prefix, so Runtime and Gateway traffic
+    can be replayed against either. `lag` tracks how late requests were sent
+    compared to the schedule: a request waits for the previous one in its
+    session, so lag grows when the endpoint is slower than the recorded one.
+    """
+
+    def __init__(self, endpoint: str, get_token, timeout: float):
+        self.endpoint = endpoint
+        self.get_token = get_token
+        self.timeout = timeout
+        self.tool_names = {}
+        self.results = defaultdict(new_result)
+        self.recorded = defaultdict(LatencyHistogram)
+        self.lag = LatencyHistogram()
+        self.skipped = defaultdict(int)
+        self.started = 0.0
+
+    async def resolve_tools(self):
+        async with streamablehttp_client(
+            self.endpoint,
+            auth_headers(await self.get_token()),
+            timeout=self.timeout,
+            terminate_on_close=False,
+        ) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                tools = (await session.list_tools()).tools
+        self.tool_names = {base_name(tool.name): tool.name for tool in tools}
+
+    async def wait_until(self, offset: float):
+        delay = self.started + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def send(self, session: ClientSession, record: dict):
+        if record["method"] == "tools/list":
+            return await session.list_tools()
+        result = await session.call_tool(
+            self.tool_names[base_name(record["tool"])],
+            record.get("arguments") or {},
+            read_timeout_seconds=timedelta(seconds=self.timeout),
+        )
+        text = "".join(c.text for c in result.content if c.type == "text")
+        if result.isError or text.startswith("Error occurred:"):
+            raise RuntimeError(text[:200] or "tool returned an error")
+        return result
+
+    def measure(self, record: dict, elapsed: float | None, error: Exception | None):
+        result = self.results[operation(record)]
+        result["calls"] += 1
+        if record.get("duration") is not None and record.get("error") is None:
+            self.recorded[operation(record)].record(record["duration"])
+        if error is None:
+            result["latency"].record(elapsed)
+            return
+        result["errors"] += 1
+        error_type = type(error).__name__
+        result["error_types"][error_type] = result["error_types"].get(error_type, 0) + 1
+
+    async def replay_session(self, records: list[dict], offsets: list[float]):
+        await self.wait_until(offsets[0])
+        if records[0]["method"] != "initialize":
+            # Recorded mid-session; the replay still needs its own initialize.
+            records = [{"method": "initialize", "duration": None}, *records]
+            offsets = [offsets[0], *offsets]
+        try:
+            async with streamablehttp_client(
+                self.endpoint,
+                auth_headers(await self.get_token()),
+                timeout=self.timeout,
+                terminate_on_close=False,
+            ) as (read_stream, write_stream, _):
+                async with ClientSession(read_stream, write_stream) as session:
+                    for record, offset in zip(records, offsets):
+                        if record["method"] == "tools/call" and (
+                            base_name(record["tool"]) not in self.tool_names
+                        ):
+                            self.skipped[record["tool"]] += 1
+                            continue
+                        await self.wait_until(offset)
+                        start = time.perf_counter()
+                        self.lag.record(max(start - self.started - offset, 0.0))
+                        try:
+                            async with asyncio.timeout(self.timeout):
+                                if record["method"] == "initialize":
+                                    await session.initialize()
+                                else:
+                                    await self.send(session, record)
+                        except Exception as e:
+                            self.measure(record, None, e)
+                            if record["method"] == "initialize":
+                                return
+                            continue
+                        self.measure(record, time.perf_counter() - start, None)
+        except Exception as e:
+            # The connection failed outside of a measured request.
+            self.measure({"method": "session", "duration": None}, None, e)
+
+    async def run(self, records: list[dict], offsets: list[float]) -> float:
+        sessions = defaultdict(lambda: ([], []))
+        for record, offset in zip(records, offsets):
+            sessions[record["session"]][0].append(record)
+            sessions[record["session"]][1].append(offset)
+        self.started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                self.replay_session(session_records, session_offsets)
+                for session_records, session_offsets in sessions.values()
+            )
+        )
+        return time.perf_counter() - self.started
+
+
+def print_results(replayer: Replayer, elapsed: float, sessions: int):
+    print("\n" + "=" * 100)
+    print(f"📼 REPLAY: {sessions} sessions in {elapsed:.2f}s")
+    print("=" * 100)
+    print(
+        f"{'operation':<36} {'ok':>9} {'rec p50':>9} {'p50 ms':>9} {'p90 ms':>9} "
+        f"{'p99 ms':>9} {'max ms':>9}"
+    )
+    for name, result in sorted(replayer.results.items()):
+        latency = result["latency"]
+        recorded = replayer.recorded.get(name)
+        ok = f"{latency.count}/{result['calls']}"
+        recorded_p50 = (
+            f"{recorded.percentile(50) * 1000:.2f}" if recorded and recorded.count else "-"
+        )
+        if latency.count:
+            values = [latency.percentile(q) * 1000 for q in (50, 90, 99)] + [latency.max * 1000]
+            columns = " ".join(f"{v:>9.2f}" for v in values)
+        else:
+            columns = " ".join(f"{'-':>9}" for _ in range(4))
+        print(f"{name:<36} {ok:>9} {recorded_p50:>9} {columns}")
+        if result["error_types"]:
+            print(f"{'':<36} errors: {result['error_types']}")
+    if replayer.lag.count:
+        print(
+            f"\n⏱️ Send lag behind the schedule: p50 {replayer.lag.percentile(50) * 1000:.2f}ms, "
+            f"max {replayer.lag.max * 1000:.2f}ms"
+        )
+    if replayer.skipped:
+        print(f"⚠️ Skipped calls to tools the endpoint does not have: {dict(replayer.skipped)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay MCP traffic recorded by record_proxy.py with its original timing"
+    )
+    parser.add_argument("log", help="JSON Lines file written by record_proxy.py")
+    parser.add_argument(
+        "--endpoint",
+        help="MCP endpoint URL, e.g. a local server (defaults to GATEWAY_ENDPOINT_URL)",
+    )
+    parser.add_argument(
+        "--no-auth",
+        action="store_true",
+        help="Do not fetch an access token (for local servers)",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Time scale: 2 replays twice as fast as recorded, 0.5 at half speed",
+    )
+    parser.add_argument(
+        "--max-gap",
+        type=float,
+        help="Cap every idle gap between requests at this many seconds (after --speed)",
+    )
+    parser.add_argument(
+        "--tool",
+        action="append",
+        dest="tools",
+        help="Replay only calls to this tool (repeatable; other methods are kept)",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=300.0, help="Seconds before a request is counted as failed"
+    )
+    parser.add_argument("--output", metavar="PATH", help="Write the results as JSON")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    return args
+
+
+async def main():
+    args = parse_args()
+    validate_env_vars(endpoint=not args.endpoint, auth=not args.no_auth)
+    records = load_records(args.log, args.tools)
+    if not records:
+        raise ValueError(f"No replayable requests in {args.log}")
+    offsets = schedule(records, args.speed, args.max_gap)
+    sessions = len({r["session"] for r in records})
+
+    if args.no_auth:
+        get_token = no_access_token
+    else:
+        get_token = get_access_token
+        await get_access_token()
+        token_provider.start_background_refresh()
+    mcp_endpoint = args.endpoint or os.getenv("GATEWAY_ENDPOINT_URL", "")
+
+    replayer = Replayer(mcp_endpoint, get_token, args.timeout)
+    await replayer.resolve_tools()
+    print(
+        f"📼 Replaying {len(records)} requests in {sessions} sessions over "
+        f"{offsets[-1]:.1f}s (speed x{args.speed:g}) against {mcp_endpoint}"
+    )
+    elapsed = await replayer.run(records, offsets)
+    print_results(replayer, elapsed, sessions)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "run": environment_metadata(mcp_endpoint, vars(args)),
+                    "elapsed": elapsed,
+                    "sessions": sessions,
+                    "results": {
+                        name: {
+                            **{k: v for k, v in result.items() if k != "latency"},
+                            "latency": result["latency"].to_dict(),
+                            "recorded": replayer.recorded[name].to_dict(),
+                        }
+                        for name, result in replayer.results.items()
+                    },
+                    "lag": replayer.lag.to_dict(),
+                    "skipped": dict(replayer.skipped),
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    await token_provider.stop_background_refresh()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+import csv
+import json
+import platform
+import socket
+import subprocess
+import sys
+from datetime import datetime, timezone
+from importlib import metadata
+from urllib.parse import urlsplit
+
+RESULT_VERSION = 1
+# Error of the sample written for an open-loop arrival dropped at the in-flight cap.
+DROPPED = "dropped"
+
+
+def package_version(name: str) -> str | None:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_metadata(endpoint: str, args: dict) -> dict:
+    # Only the host of the endpoint is recorded so result files can be shared.
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "packages": {
+            name: package_version(name) for name in ("mcp", "bedrock-agentcore")
+        },
+        "git_revision": git_revision(),
+        "endpoint_host": urlsplit(endpoint).netloc,
+        "args": args,
+    }
+
+
+def summarize(histograms: dict) -> dict:
+    return {
+        name: {
+            "count": h.count,
+            "mean": h.mean(),
+            "p50": h.percentile(50),
+            "p90": h.percentile(90),
+            "p99": h.percentile(99),
+            "p99.9": h.percentile(99.9),
+            "min": h.min if h.count else None,
+            "max": h.max if h.count else None,
+        }
+        for name, h in histograms.items()
+    }
+
+
+class ResultRecorder:
+    """Writes one record per measured sample plus a closing summary.
+
+    `.jsonl` output holds a `run` header, `sample` lines and a `summary`
+    line. `.csv` output holds one row per sample and the header/summary go
+    to a sidecar `<path>.summary.json`.
+    """
+
+    def __init__(self, path: str, endpoint: str, args: dict, operations: list[str]):
+        self.path = path
+        self.csv = path.endswith(".csv")
+        self.run = {
+            "type": "run",
+            "version": RESULT_VERSION,
+            **environment_metadata(endpoint, args),
+        }
+        self._file = open(path, "w", newline="")
+        if self.csv:
+            self._csv_writer = csv.DictWriter(
+                self._file,
+                fieldnames=["phase", "timestamp", "error", *operations],
+                extrasaction="ignore",
+            )
+            self._csv_writer.writeheader()
+        else:
+            self._write_json(self.run)
+
+    def _write_json(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def sample(self, phase: str, times: dict | None, error: str | None = None):
+        record = {
+            "type": "sample",
+            "phase": phase,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "error": error,
+            "times": times or {},
+        }
+        if not self.csv:
+            self._write_json(record)
+            return
+
+        self._csv_writer.writerow(
+            {
+                "phase": phase,
+                "timestamp": record["timestamp"],
+                "error": error or "",
+                **record["times"],
+            }
+        )
+
+    def close(self, histograms: dict):
+        summary = {
+            "type": "summary",
+            "stats": summarize(histograms),
+            "histograms": {name: h.to_dict() for name, h in histograms.items()},
+        }
+        if self.csv:
+            with open(f"{self.path}.summary.json", "w") as f:
+                json.dump({"run": self.run, "summary": summary}, f, ensure_ascii=False)
+        else:
+            self._write_json(summary)
+        self._file.close()
+
+
+def load_results(path: str) -> dict:
+    """Return {"run": ..., "samples": [...], "summary": ...} for a result file."""
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            samples = []
+            for row in csv.DictReader(f):
+                phase = row.pop("phase")
+                row.pop("timestamp")
+                error = row.pop("error") or None
+                times = {k: float(v) for k, v in row.items() if v not in ("", None)}
+                samples.append({"phase": phase, "error": error, "times": times})
+        with open(f"{path}.summary.json") as f:
+            sidecar = json.load(f)
+        return {"run": sidecar["run"], "samples": samples, "summary": sidecar["summary"]}
+
+    results = {"run": None, "samples": [], "summary": None}
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record["type"] == "sample":
+                results["samples"].append(record)
+            else:
+                results[record["type"]] = record
+    return results
@@ -1,3 +1,18 @@
+import base64
+import os
+import resource
+import time
+import uuid
+from functools import lru_cache
+
+# Module scope runs once per execution environment, so these identify it.
+INSTANCE_ID = uuid.uuid4().hex[:12]
+INIT_AT = time.time()
+invocations = 0
+# The Gateway passes "<target>___<tool>" as the tool name.
+TOOL_NAME_DELIMITER = "___"
+
+
 def greet_user(name: str) -> str:
     """Greet a user by name
     Args:
@@ -6,9 +21,56 @@ def greet_user(name: str) -> str:
     return f"Hello, {name}! Nice to meet you. This is a test message."
 
 
+@lru_cache(maxsize=4)
+def make_blob(size: int) -> str:
+    # Random base64 cannot be compressed in transit; cached so calls measure transfer, not generation.
+    return base64.b64encode(os.urandom(size * 3 // 4 + 3)).decode()[:size]
+
+
+def echo_blob(payload: str, response_bytes: int, context) -> dict:
+    """Receive `payload` and return a blob of `response_bytes` characters, for payload-size benchmarks.
+    Args:
+        payload: Data sent to the function; only its size is used.
+        response_bytes: Size of the blob to return.
+    """
+    started = time.perf_counter()
+    blob = make_blob(int(response_bytes))
+    return {
+        "statusCode": 200,
+        "body": blob,
+        "received_bytes": len(payload),
+        "handler_ms": round((time.perf_counter() - started) * 1000, 3),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "memory_limit_mb": getattr(context, "memory_limit_in_mb", None),
+    }
+
+
+def get_tool_name(context) -> str:
+    try:
+        name = context.client_context.custom["bedrockAgentCoreToolName"]
+    except (AttributeError, KeyError, TypeError):
+        return "greet_user"
+    return name.split(TOOL_NAME_DELIMITER, 1)[-1]
+
+
+def instance_metadata() -> dict:
+    # Lets measure_latency.py tell cold starts from warm invocations.
+    return {
+        "instance_id": INSTANCE_ID,
+        "cold_start": invocations == 1,
+        "invocations": invocations,
+        "uptime_s": round(time.time() - INIT_AT, 3),
+    }
+
+
 def lambda_handler(event, context):
+    global invocations
+    invocations += 1
     try:
+        if get_tool_name(context) == "echo_blob":
+            response = echo_blob(event.get("payload", ""), event.get("response_bytes", 0), context)
+            return {**response, "instance": instance_metadata()}
         result = greet_user(event.get("name"))
-        return {"statusCode": 200, "body": result}
+        return {"statusCode": 200, "body": result, "instance": instance_metadata()}
     except Exception as e:
-        return {"statusCode": 500, "body": f"Error occurred: {str(e)}"}
+        return {"statusCode": 500, "body": f"Error occurred: {str(e)}", "instance": instance_metadata()}
@@ -14,4 +14,5 @@ new AgentcoreRuntimeMcpStack(app, "AgentcoreRuntimeMcpStack", {
     region: process.env.CDK_DEFAULT_REGION || "us-east-1",
   },
   openaiApiKey: process.env.OPENAI_API_KEY || "",
+  otelInstrument: process.env.OTEL_INSTRUMENT !== "false",
 });
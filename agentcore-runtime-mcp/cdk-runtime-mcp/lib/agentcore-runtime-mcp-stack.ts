@@ -9,6 +9,12 @@ import { ProtocolType } from "@aws-cdk/aws-bedrock-agentcore-alpha";
 
 export interface AgentcoreRuntimeMcpStackProps extends cdk.StackProps {
   openaiApiKey: string;
+  /**
+   * Start the MCP server with opentelemetry-instrument (ADOT traces).
+   * Disable for faster cold starts.
+   * @default true
+   */
+  otelInstrument?: boolean;
 }
 
 export class AgentcoreRuntimeMcpStack extends cdk.Stack {
@@ -111,6 +117,9 @@ export class AgentcoreRuntimeMcpStack extends cdk.Stack {
       directory: path.join(__dirname, "../mcp_server"),
       platform: Platform.LINUX_ARM64,
       exclude: [".venv", "__pycache__", "*.pyc", ".git"],
+      buildArgs: {
+        OTEL_INSTRUMENT: String(props.otelInstrument ?? true),
+      },
     });
 
     // ========================================
@@ -0,0 +1,199 @@
+import asyncio
+import contextlib
+import os
+import re
+import time
+from collections import deque
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class Overloaded(Exception):
+    """The server cannot take the call now; the caller may retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"server overloaded ({reason}), retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounds the work running at once and the work waiting for it.
+
+    Up to `max_in_flight` callers run; the next `max_queue` wait in FIFO order
+    for at most `max_wait` seconds each. Anything beyond that is rejected
+    immediately with `Overloaded`, so under overload callers fail fast instead
+    of all slowing down together. The retry-after hint is the expected time
+    for the queue ahead to drain, from a moving average of the service time.
+    """
+
+    def __init__(self, max_in_flight: int = 32, max_queue: int = 64, max_wait: float = 10.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._waiters = deque()
+        self._service_time = None
+        self.counts = {"admitted": 0, "enqueued": 0, "rejected_queue_full": 0, "rejected_wait": 0}
+
+    @classmethod
+    def from_env(cls, max_in_flight: int) -> "AdmissionController":
+        return cls(
+            max_in_flight=max_in_flight,
+            max_queue=int(os.getenv("SEARCH_QUEUE_SIZE", "64")),
+            max_wait=float(os.getenv("SEARCH_QUEUE_TIMEOUT", "10")),
+        )
+
+    def retry_after(self) -> float:
+        service_time = self._service_time or self.max_wait
+        ahead = len(self._waiters) + 1
+        return max(1.0, service_time * ahead / self.max_in_flight)
+
+    async def _acquire(self):
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.counts["rejected_queue_full"] += 1
+            raise Overloaded("queue full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counts["enqueued"] += 1
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self._release()
+            else:
+                # _release() may already have dropped the cancelled waiter.
+                with contextlib.suppress(ValueError):
+                    self._waiters.remove(waiter)
+            if isinstance(e, TimeoutError):
+                self.counts["rejected_wait"] += 1
+                raise Overloaded(f"queued for {self.max_wait:g}s", self.retry_after()) from e
+            raise
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; in_flight is unchanged.
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @contextlib.asynccontextmanager
+    async def admit(self):
+        await self._acquire()
+        self.counts["admitted"] += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self._service_time = (
+                elapsed if self._service_time is None else 0.8 * self._service_time + 0.2 * elapsed
+            )
+            self._release()
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "queued": len(self._waiters), **self.counts}
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Seconds in an OpenAI reset header ("20ms", "1s", "6m0s") or a plain number."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Paces upstream calls and backs off when the upstream says to.
+
+    Calls take one token from a bucket refilled at `rate` per second holding at
+    most `burst` tokens (`rate` 0 disables pacing). `observe()` reads OpenAI's
+    rate-limit headers from every response: when the remaining requests or
+    tokens reach zero, or a 429 carries `retry-after`, no call is let through
+    until the reset. A call that would wait longer than `max_wait` is rejected
+    with `Overloaded` instead.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: int = 10, max_wait: float = 10.0):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.counts = {"paced": 0, "paused": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls) -> "TokenBucket":
+        return cls(
+            rate=float(os.getenv("UPSTREAM_RATE", "0")),
+            burst=int(os.getenv("UPSTREAM_BURST", "10")),
+            max_wait=float(os.getenv("SEARCH_QUEUE_TIMEOUT", "10")),
+        )
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        now = time.monotonic()
+        wait = max(self._paused_until - now, 0.0)
+        if self.rate > 0:
+            self._refill(now)
+            # Reserve the token now; a negative balance queues callers behind each other.
+            self._tokens -= 1
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+        if wait > self.max_wait:
+            if self.rate > 0:
+                self._tokens += 1
+            self.counts["rejected"] += 1
+            raise Overloaded("upstream rate limit", wait)
+        if wait > 0:
+            self.counts["paced"] += 1
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # The call will not be made; give the reserved token back.
+                if self.rate > 0:
+                    self._tokens += 1
+                raise
+
+    def pause(self, seconds: float):
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self.counts["paused"] += 1
+
+    def observe(self, status_code: int, headers):
+        if status_code == 429:
+            retry_after = parse_duration(headers.get("retry-after-ms"))
+            retry_after = retry_after / 1000 if retry_after is not None else None
+            retry_after = retry_after or parse_duration(headers.get("retry-after")) or 1.0
+            self.pause(retry_after)
+            return
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining is not None and reset and remaining.isdigit() and int(remaining) == 0:
+                self.pause(reset)
+
+    def stats(self) -> dict:
+        return {
+            "paused_for": round(max(self._paused_until - time.monotonic(), 0.0), 3),
+            **self.counts,
+        }
@@ -1,44 +1,481 @@
-from mcp.server.fastmcp import FastMCP
-from openai import OpenAI
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import time
+from typing import TYPE_CHECKING
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER
+from mcp.types import CallToolResult, TextContent
 from pydantic import Field
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from .admission import AdmissionController, Overloaded, TokenBucket
+from .metrics import RETRY_AFTER_META_KEY, Metrics
+from .progress import ProgressRelays
+from .search_cache import MemoryBackend, SearchCache, normalize_question
+from .session_store import SessionState, SessionStore
+from .singleflight import SingleFlight
+from .tracing import extract, setup_tracing, span
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 INSTRUCTIONS = """
 - You must answer the question using web_search tool.
 - You must respond in japanese.
 """
 
-mcp = FastMCP(name="openai-web-search-mcp-server", host="0.0.0.0", stateless_http=True)
+EMBEDDING_MODEL = os.getenv("SEARCH_CACHE_EMBEDDING_MODEL", "text-embedding-3-small")
+# Upper bound on how long one request waits for a (possibly shared) search.
+SEARCH_WAIT_TIMEOUT = float(os.getenv("SEARCH_WAIT_TIMEOUT", "300"))
+# Timeout for each OpenAI API request.
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "300"))
+MAX_CONCURRENT_SEARCHES = int(os.getenv("MAX_CONCURRENT_SEARCHES", "32"))
+DISCONNECT_POLL_INTERVAL = 1.0
+# Stream answers and forward partial text to clients that send a progress token.
+SEARCH_STREAMING = os.getenv("SEARCH_STREAMING", "true").lower() == "true"
+PROGRESS_INTERVAL = float(os.getenv("SEARCH_PROGRESS_INTERVAL", "0.2"))
+MAX_BATCH_QUESTIONS = int(os.getenv("MAX_BATCH_QUESTIONS", "10"))
+# Searches one batch call may run at once; MAX_CONCURRENT_SEARCHES still applies.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "5"))
+# The openai SDK is imported on the first search so the server answers initialize
+# sooner after a cold start. Set to "true" to import it at startup instead.
+OPENAI_PREWARM = os.getenv("OPENAI_PREWARM", "false").lower() == "true"
+# Keep per-session state (answers, the previous OpenAI response) for follow-up questions.
+MCP_STATEFUL = os.getenv("MCP_STATEFUL", "false").lower() == "true"
+RUNTIME_SESSION_HEADER = "x-amzn-bedrock-agentcore-runtime-session-id"
+
+mcp = FastMCP(
+    name="openai-web-search-mcp-server", host="0.0.0.0", stateless_http=not MCP_STATEFUL
+)
+# Keeps the provider of opentelemetry-instrument; exports locally with OTEL_TRACES_FILE.
+setup_tracing("openai-web-search-mcp-server")
+search_cache = SearchCache.from_env()
+search_flight = SingleFlight()
+search_admission = AdmissionController.from_env(MAX_CONCURRENT_SEARCHES)
+upstream_bucket = TokenBucket.from_env()
+search_relays = ProgressRelays(PROGRESS_INTERVAL)
+session_store = SessionStore.from_env() if MCP_STATEFUL else None
+metrics = Metrics()
+metrics.collect("search_flight", search_flight.stats)
+metrics.collect("search_admission", search_admission.stats)
+metrics.collect("upstream", upstream_bucket.stats)
+if search_cache:
+    metrics.collect("search_cache", search_cache.stats)
+if session_store is not None:
+    metrics.collect("session", session_store.stats)
+openai_client = None
+
+
+def get_openai_client() -> "AsyncOpenAI":
+    # Created on first use so a missing API key surfaces as a tool error.
+    global openai_client
+    if openai_client is None:
+        started = time.perf_counter()
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        openai_client = AsyncOpenAI(
+            timeout=SEARCH_TIMEOUT,
+            http_client=DefaultAsyncHttpxClient(event_hooks={"response": [observe_rate_limits]}),
+        )
+        init_ms = (time.perf_counter() - started) * 1000
+        print(json.dumps({"openai_client_init_ms": round(init_ms, 1)}))
+    return openai_client
+
+
+async def observe_rate_limits(response):
+    # Every OpenAI response, including the SDK's own retries of a 429.
+    upstream_bucket.observe(response.status_code, response.headers)
+
+
+async def run_cache(fn, *args):
+    # Shared backends do network I/O; keep it off the event loop.
+    if isinstance(search_cache.backend, MemoryBackend):
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+async def embed_question(client: "AsyncOpenAI", question: str) -> list[float]:
+    await upstream_bucket.acquire()
+    with (
+        span("openai.embeddings.create", **{"gen_ai.request.model": EMBEDDING_MODEL}),
+        metrics.timed("openai_request", operation="embeddings.create"),
+    ):
+        response = await client.embeddings.create(
+            model=EMBEDDING_MODEL, input=normalize_question(question)
+        )
+    return response.data[0].embedding
+
+
+def log_cache_lookup(hit: bool):
+    print(json.dumps({"search_cache": "hit" if hit else "miss", **search_cache.stats()}))
+
+
+async def create_response(
+    client: "AsyncOpenAI", prompt, relay, previous_response_id: str | None = None
+) -> tuple[str, str | None]:
+    """Run one search; returns (answer, OpenAI response id)."""
+    request = {
+        "model": "gpt-5",
+        "tools": [{"type": "web_search"}],
+        "instructions": INSTRUCTIONS,
+        "input": prompt,
+    }
+    if previous_response_id:
+        request["previous_response_id"] = previous_response_id
+    await upstream_bucket.acquire()
+    started = time.perf_counter()
+    with (
+        span(
+            "openai.responses.create",
+            **{"gen_ai.request.model": request["model"], "openai.stream": SEARCH_STREAMING},
+        ) as current,
+        metrics.timed("openai_request", operation="responses.create"),
+    ):
+        if not SEARCH_STREAMING:
+            response = await client.responses.create(**request)
+            return response.output_text, response.id
+
+        output_text = None
+        response_id = None
+        stream = await client.responses.create(**request, stream=True)
+        async for event in stream:
+            if event.type == "response.output_text.delta":
+                if not relay.text:
+                    metrics.observe("openai_first_token_seconds", time.perf_counter() - started)
+                    if current is not None:
+                        current.add_event("first_token")
+                await relay.append(event.delta)
+            elif event.type == "response.completed":
+                output_text = event.response.output_text
+                response_id = event.response.id
+            elif event.type == "response.failed":
+                raise RuntimeError(event.response.error.message)
+        await relay.flush()
+        return (output_text if output_text is not None else relay.text), response_id
+
+
+async def run_search(
+    client: "AsyncOpenAI", key: str, prompt, previous_response_id: str | None = None
+) -> tuple[str, str | None]:
+    # Partial answers go to every request subscribed to `key`.
+    relay = search_relays.acquire(key)
+    relay.reset()
+    try:
+        async with search_admission.admit():
+            return await create_response(client, prompt, relay, previous_response_id)
+    finally:
+        search_relays.release(key, relay)
+
+
+async def search(question: str) -> tuple[str, str | None]:
+    client = get_openai_client()
+    embedding = None
+    if search_cache:
+        with span("search_cache.get") as current:
+            cached = await run_cache(search_cache.get, question)
+            if cached is None and search_cache.semantic:
+                # Only misses pay for the embedding; this runs once per coalesced search.
+                embedding = await embed_question(client, question)
+                # The scan covers every cached embedding; keep it off the event loop.
+                cached = await asyncio.to_thread(search_cache.get_similar, embedding)
+            if current is not None:
+                current.set_attribute("search_cache.hit", cached is not None)
+        log_cache_lookup(cached is not None)
+        if cached is not None:
+            return cached, None
+
+    answer, response_id = await run_search(client, SearchCache.key(question), question)
+    if search_cache:
+        await run_cache(search_cache.set, question, answer, embedding)
+    return answer, response_id
+
+
+def session_state(ctx: Context | None) -> SessionState | None:
+    """State of the caller's MCP session (or Runtime session), when stateful mode is on."""
+    request = ctx.request_context.request if ctx else None
+    if session_store is None or request is None:
+        return None
+    session_id = request.headers.get(MCP_SESSION_ID_HEADER) or request.headers.get(
+        RUNTIME_SESSION_HEADER
+    )
+    return session_store.get(session_id) if session_id else None
+
+
+def follow_up_key(state: SessionState | None, question: str, follow_up: bool) -> str:
+    # Follow-ups do not share searches (or progress) with the same question elsewhere.
+    if state is None:
+        return SearchCache.key(question)
+    return state.answer_key(question, follow_up)
+
+
+async def session_search(
+    state: SessionState, question: str, follow_up: bool, timeout: float
+) -> str:
+    """Search on behalf of a session.
+
+    Questions already answered in the session are returned from its state.
+    A follow-up continues the session's previous OpenAI response through
+    `previous_response_id`, so the earlier turns are not sent again; if that
+    turn came from the cache, the previous question and answer are sent as
+    context instead. Other questions go through the shared cache and search.
+    """
+    key = state.answer_key(question, follow_up)
+    answer = state.get_answer(key)
+    if answer is not None:
+        print(json.dumps({"session": "answer_reused", **session_store.stats()}))
+        return answer
+
+    if follow_up and state.has_context:
+        prompt, previous_response_id = question, state.previous_response_id
+        if previous_response_id is None:
+            previous_question, previous_answer = state.previous_turn
+            prompt = [
+                {"role": "user", "content": previous_question},
+                {"role": "assistant", "content": previous_answer},
+                {"role": "user", "content": question},
+            ]
+        async with asyncio.timeout(timeout):
+            answer, response_id = await run_search(
+                get_openai_client(), key, prompt, previous_response_id
+            )
+        print(json.dumps({"session": "follow_up", **session_store.stats()}))
+    else:
+        answer, response_id = await shared_search(question, timeout)
+    state.record(key, question, answer, response_id)
+    return answer
+
+
+def trace_parent(ctx: Context | None):
+    """The client's trace context, from the call's _meta or else the HTTP headers."""
+    if ctx is None:
+        return None
+    meta = ctx.request_context.meta
+    parent = extract(meta.model_dump()) if meta else None
+    request = ctx.request_context.request
+    if parent is None and request is not None:
+        parent = extract(request.headers)
+    return parent
+
+
+def wait_timeout(ctx: Context | None) -> float:
+    """SEARCH_WAIT_TIMEOUT, shortened to the client's remaining deadline if it sent one."""
+    meta = ctx.request_context.meta if ctx else None
+    timeout_ms = getattr(meta, "timeoutMs", None)
+    if isinstance(timeout_ms, (int, float)) and timeout_ms > 0:
+        return min(SEARCH_WAIT_TIMEOUT, timeout_ms / 1000)
+    return SEARCH_WAIT_TIMEOUT
+
+
+def shared_search(question: str, timeout: float = SEARCH_WAIT_TIMEOUT):
+    # Identical questions in flight at the same time share one upstream call;
+    # it is cancelled once every request waiting for it has timed out.
+    return search_flight.do(
+        SearchCache.key(question), lambda: search(question), timeout=timeout
+    )
+
+
+async def shared_search_answer(question: str, timeout: float = SEARCH_WAIT_TIMEOUT) -> str:
+    answer, _ = await shared_search(question, timeout)
+    return answer
+
+
+def overloaded_result(e: Overloaded) -> CallToolResult:
+    """An error result with the retry-after hint in `_meta`, for clients that back off."""
+    print(
+        json.dumps(
+            {
+                "admission": "rejected",
+                "reason": e.reason,
+                "retry_after": round(e.retry_after, 1),
+                **search_admission.stats(),
+                "upstream": upstream_bucket.stats(),
+            }
+        )
+    )
+    text = f"Error occurred: {e}"
+    return CallToolResult(
+        content=[TextContent(type="text", text=text)],
+        structuredContent={"result": text},
+        isError=True,
+        _meta={RETRY_AFTER_META_KEY: int(e.retry_after * 1000)},
+    )
+
+
+def error_message(e: Exception, timeout: float = SEARCH_WAIT_TIMEOUT) -> str:
+    if isinstance(e, TimeoutError):
+        return f"no search result within {timeout:g}s"
+    return str(e)
+
+
+@contextlib.contextmanager
+def relay_progress(ctx: Context | None, key: str):
+    """Subscribe this request to the partial answers of the search for `key`."""
+    meta = ctx.request_context.meta if ctx else None
+    if not SEARCH_STREAMING or meta is None or meta.progressToken is None:
+        yield
+        return
+
+    relay = search_relays.acquire(key)
+    relay.add_listener(ctx)
+    try:
+        yield
+    finally:
+        relay.remove_listener(ctx)
+        search_relays.release(key, relay)
+
+
+async def wait_for_disconnect(request):
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def cancel_on_disconnect(ctx: Context | None, coro):
+    """Run `coro`, cancelling it if the MCP client closes the HTTP request.
+
+    The stateless transport keeps running tool calls after the client goes
+    away, so a dropped request would otherwise hold a search slot until
+    OpenAI answers. Returns None when the client disconnected.
+    """
+    request = ctx.request_context.request if ctx else None
+    if request is None:
+        return await coro
+
+    work = asyncio.ensure_future(coro)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not work.done():
+            work.cancel()
+    if work.cancelled():
+        return None
+    return work.result()
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @mcp.tool()
-def openai_web_search(
+@metrics.tool
+async def openai_web_search(
     question: str = Field(
         description="""Question text to send to OpenAI o3. It supports natural language queries.
         Write in Japanese. Be direct and specific about your requirements.
         Avoid chain-of-thought instructions like "think step by step" as o3 handles reasoning internally."""
     ),
+    follow_up: bool = Field(
+        default=False,
+        description="""Set to true when the question follows up on the previous search in this session
+        (e.g. "what about its pricing?"); the earlier search is used as context.
+        Only stateful servers (MCP_STATEFUL=true) keep that context; in stateless mode this has no effect.""",
+    ),
+    ctx: Context = None,
 ) -> str:
     """An AI agent with advanced web search capabilities. Useful for finding the latest information,
     troubleshooting errors, and discussing ideas or design challenges. Supports natural language queries.
 
     Args:
         question: The search question to perform.
+        follow_up: Whether the question follows up on the previous search in this session
+            (stateful mode only).
 
     Returns:
         str: The search results with advanced reasoning and analysis.
     """
+    timeout = wait_timeout(ctx)
+    state = session_state(ctx)
     try:
-        client = OpenAI()
-        response = client.responses.create(
-            model="gpt-5",
-            tools=[{"type": "web_search"}],
-            instructions=INSTRUCTIONS,
-            input=question,
-        )
-        return response.output_text
+        with (
+            span("tool.openai_web_search", parent=trace_parent(ctx)),
+            relay_progress(ctx, follow_up_key(state, question, follow_up)),
+        ):
+            if state is not None:
+                search_call = session_search(state, question, follow_up, timeout)
+            else:
+                search_call = shared_search_answer(question, timeout)
+            answer = await cancel_on_disconnect(ctx, search_call)
+        if answer is None:
+            return "Error occurred: client disconnected"
+        return answer
+    except Overloaded as e:
+        return overloaded_result(e)
     except Exception as e:
-        return f"Error occurred: {str(e)}"
+        return f"Error occurred: {error_message(e, timeout)}"
+
+
+@mcp.tool()
+@metrics.tool
+async def openai_web_search_batch(
+    questions: list[str] = Field(
+        description=f"""Up to {MAX_BATCH_QUESTIONS} independent questions to search in parallel.
+        Each question follows the same rules as openai_web_search: write in Japanese and be direct and specific."""
+    ),
+    ctx: Context = None,
+) -> str:
+    """Run several web searches in parallel with the same capabilities as openai_web_search.
+    Use this instead of calling openai_web_search repeatedly when you have multiple related questions;
+    the call takes about as long as the slowest question.
+
+    Args:
+        questions: The search questions to perform.
+
+    Returns:
+        str: A JSON array in the same order as `questions`. Each item has `question` and either
+        `answer` or `error`.
+    """
+    if not questions:
+        return "Error occurred: no questions given"
+    if len(questions) > MAX_BATCH_QUESTIONS:
+        return f"Error occurred: at most {MAX_BATCH_QUESTIONS} questions per call"
+
+    slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+    deadline = asyncio.get_running_loop().time() + wait_timeout(ctx)
+
+    async def answer(question: str) -> dict:
+        async with slots:
+            # Questions queued behind the concurrency limit share the call's deadline.
+            timeout = max(deadline - asyncio.get_running_loop().time(), 0.0)
+            try:
+                return {
+                    "question": question,
+                    "answer": await shared_search_answer(question, timeout),
+                }
+            except Overloaded as e:
+                return {
+                    "question": question,
+                    "error": str(e),
+                    "retry_after": round(e.retry_after, 1),
+                }
+            except Exception as e:
+                return {"question": question, "error": error_message(e, timeout)}
+
+    with span(
+        "tool.openai_web_search_batch",
+        parent=trace_parent(ctx),
+        **{"batch.questions": len(questions)},
+    ):
+        results = await cancel_on_disconnect(
+            ctx, asyncio.gather(*(answer(question) for question in questions))
+        )
+    if results is None:
+        return "Error occurred: client disconnected"
+    if all("retry_after" in result for result in results):
+        return overloaded_result(
+            Overloaded("every question rejected", max(r["retry_after"] for r in results))
+        )
+    return json.dumps(results, ensure_ascii=False)
+
 
+if OPENAI_PREWARM:
+    importlib.import_module("openai")
 
 if __name__ == "__main__":
     mcp.run(transport="streamable-http")
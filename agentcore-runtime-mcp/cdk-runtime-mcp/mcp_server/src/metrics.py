@@ -0,0 +1,223 @@
+import asyncio
+import contextlib
+import functools
+import inspect
+import json
+import os
+import time
+from collections import defaultdict
+
+# Upper bounds (seconds) of the latency histogram buckets; the last one is +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+ERROR_PREFIX = "Error occurred:"
+# Milliseconds a rejected caller should wait before retrying, set in the _meta
+# of calls rejected by admission control.
+RETRY_AFTER_META_KEY = "retryAfterMs"
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-quantile (the largest bound if it is +Inf)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+def _labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Metrics:
+    """In-process counters, gauges and latency histograms for the MCP server.
+
+    `render()` returns them in the Prometheus text format for the /metrics
+    route and `log()` prints a one-line JSON summary. Collectors registered
+    with `collect()` are called at render/log time, so components that already
+    keep their own stats (cache, single-flight, ...) are exported as gauges
+    without double bookkeeping. Only used from the event loop, so no lock.
+    """
+
+    def __init__(self, prefix: str = "mcp"):
+        self.prefix = prefix
+        self.counters = defaultdict(float)
+        self.gauges = defaultdict(float)
+        self.histograms = defaultdict(Histogram)
+        self.collectors = {}
+        self.started = time.time()
+        self._reporter = None
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        self.counters[name, tuple(sorted(labels.items()))] += value
+
+    def add(self, name: str, value: float, **labels):
+        self.gauges[name, tuple(sorted(labels.items()))] += value
+
+    def observe(self, name: str, value: float, **labels):
+        self.histograms[name, tuple(sorted(labels.items()))].observe(value)
+
+    def collect(self, name: str, fn):
+        self.collectors[name] = fn
+
+    @contextlib.contextmanager
+    def timed(self, name: str, **labels):
+        """Observe `<name>_duration_seconds`; count `<name>_errors_total` by exception type."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.inc(f"{name}_errors_total", error=type(e).__name__, **labels)
+            raise
+        finally:
+            self.observe(f"{name}_duration_seconds", time.perf_counter() - started, **labels)
+
+    def tool(self, fn):
+        """Count calls, in-flight calls, latency and errors of a tool function.
+
+        Tools here report failures as "Error occurred: ..." text or an isError
+        result rather than raising, so the outcome is read from the result.
+        """
+        name = fn.__name__
+
+        def finish(started: float, outcome: str):
+            self.add("tool_in_flight", -1, tool=name)
+            self.inc("tool_calls_total", tool=name, outcome=outcome)
+            self.observe("tool_duration_seconds", time.perf_counter() - started, tool=name)
+
+        def start() -> float:
+            self.start_reporter()
+            self.add("tool_in_flight", 1, tool=name)
+            return time.perf_counter()
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                started, outcome = start(), "exception"
+                try:
+                    result = await fn(*args, **kwargs)
+                    outcome = outcome_of(result)
+                    return result
+                finally:
+                    finish(started, outcome)
+
+        else:
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                started, outcome = start(), "exception"
+                try:
+                    result = fn(*args, **kwargs)
+                    outcome = outcome_of(result)
+                    return result
+                finally:
+                    finish(started, outcome)
+
+        return wrapper
+
+    def _collected(self) -> dict:
+        values = {}
+        for source, fn in self.collectors.items():
+            for key, value in fn().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values[f"{source}_{key}"] = value
+        return values
+
+    def render(self) -> str:
+        lines = []
+        p = self.prefix
+        for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+            for name in sorted({name for name, _ in series}):
+                lines.append(f"# TYPE {p}_{name} {kind}")
+                for (metric, labels), value in sorted(series.items()):
+                    if metric == name:
+                        lines.append(f"{p}_{name}{_labels(labels)} {value:g}")
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {p}_{name} histogram")
+            for (metric, labels), histogram in sorted(self.histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else f"{bound:g}"
+                    lines.append(f"{p}_{name}_bucket{_labels((*labels, ('le', le)))} {cumulative}")
+                lines.append(f"{p}_{name}_sum{_labels(labels)} {histogram.sum:g}")
+                lines.append(f"{p}_{name}_count{_labels(labels)} {histogram.count}")
+        for key, value in sorted(self._collected().items()):
+            lines.append(f"# TYPE {p}_{key} gauge")
+            lines.append(f"{p}_{key} {value:g}")
+        lines.append(f"# TYPE {p}_uptime_seconds gauge")
+        lines.append(f"{p}_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        def series(name, labels):
+            return name + "".join(f".{value}" for _, value in labels)
+
+        return {
+            "counters": {series(*key): value for key, value in self.counters.items()},
+            "gauges": {series(*key): value for key, value in self.gauges.items()},
+            "latency": {
+                series(*key): {
+                    "count": h.count,
+                    "mean": round(h.sum / h.count, 6) if h.count else None,
+                    "p50_le": h.quantile(0.5),
+                    "p95_le": h.quantile(0.95),
+                }
+                for key, h in self.histograms.items()
+            },
+            **self._collected(),
+        }
+
+    def log(self):
+        print(json.dumps({"metrics": self.snapshot()}, ensure_ascii=False))
+
+    def start_reporter(self, interval: float | None = None):
+        """Log the snapshot every METRICS_LOG_INTERVAL seconds (0 disables); started on first use."""
+        if interval is None:
+            interval = float(os.getenv("METRICS_LOG_INTERVAL", "60"))
+        if self._reporter is not None or interval <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._reporter = loop.create_task(self._report(interval))
+
+    async def _report(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.log()
+
+
+def outcome_of(result) -> str:
+    if getattr(result, "isError", False):
+        return "rejected" if RETRY_AFTER_META_KEY in (result.meta or {}) else "error"
+    if isinstance(result, str) and result.startswith(ERROR_PREFIX):
+        return "error"
+    return "ok"
+
@@ -0,0 +1,85 @@
+import time
+
+
+async def send_progress(ctx, progress: float, message: str):
+    # Context.report_progress does not link the notification to the request,
+    # so on the stateless transport it would go to the (unused) GET stream
+    # instead of this request's SSE response.
+    request_context = ctx.request_context
+    await request_context.session.send_progress_notification(
+        progress_token=request_context.meta.progressToken,
+        progress=progress,
+        message=message,
+        related_request_id=ctx.request_id,
+    )
+
+
+class ProgressRelay:
+    """Forwards streamed answer text to every request waiting on one search.
+
+    Listeners are MCP request contexts. Each flush sends a listener the text it
+    has not seen yet as the progress message, with the total number of
+    characters streamed so far as the progress value, so a request that joins
+    mid-stream first receives everything before it. Flushes are throttled to
+    one per `interval` seconds, except the first one, which goes out
+    immediately to keep time-to-first-token low.
+    """
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.text = ""
+        self.users = 0
+        self._listeners = {}
+        self._last_flush = None
+
+    def add_listener(self, ctx):
+        # Contexts are unhashable pydantic models, so key them by identity.
+        self._listeners[id(ctx)] = [ctx, 0]
+
+    def remove_listener(self, ctx):
+        self._listeners.pop(id(ctx), None)
+
+    def reset(self):
+        self.text = ""
+        self._last_flush = None
+        for listener in self._listeners.values():
+            listener[1] = 0
+
+    async def append(self, delta: str):
+        self.text += delta
+        now = time.monotonic()
+        if self._last_flush is None or now - self._last_flush >= self.interval:
+            await self.flush()
+
+    async def flush(self):
+        self._last_flush = time.monotonic()
+        for listener in list(self._listeners.values()):
+            ctx, sent = listener
+            if sent == len(self.text):
+                continue
+            listener[1] = len(self.text)
+            try:
+                await send_progress(ctx, len(self.text), self.text[sent:])
+            except Exception:
+                # The client went away; its request is cancelled separately.
+                self.remove_listener(ctx)
+
+
+class ProgressRelays:
+    """Relays keyed by search, shared by the search and the requests awaiting it."""
+
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self._relays = {}
+
+    def acquire(self, key: str) -> ProgressRelay:
+        relay = self._relays.get(key)
+        if relay is None:
+            relay = self._relays[key] = ProgressRelay(self.interval)
+        relay.users += 1
+        return relay
+
+    def release(self, key: str, relay: ProgressRelay):
+        relay.users -= 1
+        if relay.users == 0 and self._relays.get(key) is relay:
+            del self._relays[key]
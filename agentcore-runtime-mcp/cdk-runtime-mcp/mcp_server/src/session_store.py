@@ -0,0 +1,100 @@
+import os
+import time
+from collections import OrderedDict
+
+from .search_cache import SearchCache
+
+
+class SessionState:
+    """What one MCP session remembers between tool calls."""
+
+    def __init__(self, max_answers: int):
+        self.max_answers = max_answers
+        # Answers already given in this session, by question (and the response they followed).
+        self.answers = OrderedDict()
+        # The last search, so a follow-up can continue it.
+        self.previous_response_id = None
+        self.previous_turn = None
+        self.turns = 0
+        self.last_used = time.monotonic()
+
+    def answer_key(self, question: str, follow_up: bool) -> str:
+        key = SearchCache.key(question)
+        if follow_up and self.has_context:
+            # A follow-up's answer depends on the turn it follows.
+            return f"{self.turns}:{key}"
+        return key
+
+    @property
+    def has_context(self) -> bool:
+        return self.previous_response_id is not None or self.previous_turn is not None
+
+    def get_answer(self, key: str) -> str | None:
+        answer = self.answers.get(key)
+        if answer is not None:
+            self.answers.move_to_end(key)
+        return answer
+
+    def record(self, key: str, question: str, answer: str, response_id: str | None):
+        self.answers[key] = answer
+        self.answers.move_to_end(key)
+        while len(self.answers) > self.max_answers:
+            self.answers.popitem(last=False)
+        # Without a response id (e.g. a cache hit) follow-ups re-send this turn instead.
+        self.previous_response_id = response_id
+        self.previous_turn = (question, answer)
+        self.turns += 1
+
+
+class SessionStore:
+    """Per-session state with LRU eviction and idle expiry.
+
+    At most `max_sessions` sessions are kept; the least recently used one is
+    dropped to make room, and sessions idle for `idle_ttl` seconds expire.
+    Each session keeps its last `max_answers` answers. Only used from the
+    event loop, so it needs no lock.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_ttl: float = 1800.0, max_answers: int = 32):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_answers = max_answers
+        self._sessions = OrderedDict()
+        self.evicted = 0
+        self.expired = 0
+
+    @classmethod
+    def from_env(cls) -> "SessionStore":
+        return cls(
+            max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "1000")),
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+            max_answers=int(os.getenv("SESSION_MAX_ANSWERS", "32")),
+        )
+
+    def _expire(self, now: float):
+        while self._sessions:
+            key, state = next(iter(self._sessions.items()))
+            if now - state.last_used <= self.idle_ttl:
+                break
+            del self._sessions[key]
+            self.expired += 1
+
+    def get(self, session_id: str) -> SessionState:
+        now = time.monotonic()
+        self._expire(now)
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = SessionState(self.max_answers)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        self._sessions.move_to_end(session_id)
+        state.last_used = now
+        return state
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
@@ -0,0 +1,54 @@
+import asyncio
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the work; callers arriving while it is in
+    flight wait on the same task and receive its result or exception. Each
+    caller can bound its own wait with `timeout` without affecting the others,
+    and the shared task is cancelled once every caller has given up.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn, timeout: float | None = None):
+        entry = self._calls.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(fn())
+            entry = self._calls[key] = {"task": task, "waiters": 0}
+            task.add_done_callback(lambda t: self._forget(key, entry))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        entry["waiters"] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(entry["task"]), timeout)
+        finally:
+            entry["waiters"] -= 1
+            if entry["waiters"] == 0 and not entry["task"].done():
+                # Forget the key now, not in the done callback, so a caller
+                # arriving meanwhile starts a new execution instead of joining
+                # the cancelled one.
+                if self._calls.get(key) is entry:
+                    del self._calls[key]
+                entry["task"].cancel()
+
+    def _forget(self, key: str, entry: dict):
+        if self._calls.get(key) is entry:
+            del self._calls[key]
+        task = entry["task"]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter timed out.
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
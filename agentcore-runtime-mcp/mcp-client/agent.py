@@ -1,35 +1,43 @@
+import argparse
 import asyncio
+import contextlib
 import os
-import sys
 
-from bedrock_agentcore.identity.auth import requires_access_token
+from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from dotenv import load_dotenv
 from mcp.client.streamable_http import streamablehttp_client
 from strands import Agent
-from strands.tools.mcp import MCPClient
+from strands.models import BedrockModel
+from strands.tools.mcp import MCPAgentTool, MCPClient
+
+from session_pool import MCPClientPool
+from token_provider import TokenProvider
+from tool_cache import ToolCache
 
 load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
 
 
-@requires_access_token(
+token_provider = TokenProvider(
     provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
     scopes=[
         os.getenv("OAUTH2_SCOPE_READ"),
         os.getenv("OAUTH2_SCOPE_WRITE"),
     ],
-    auth_flow="M2M",
 )
-async def get_access_token(*, access_token: str) -> str:
-    return access_token
 
 
-def validate_env_vars():
+async def get_access_token() -> str:
+    return await token_provider.get_token()
+
+
+def validate_env_vars(endpoint: bool = True):
     required = [
-        "RUNTIME_ARN",
         "OAUTH2_PROVIDER_NAME",
         "OAUTH2_SCOPE_READ",
         "OAUTH2_SCOPE_WRITE",
     ]
+    if endpoint:
+        required.append("RUNTIME_ARN")
     missing = [var for var in required if not os.getenv(var)]
     if missing:
         raise ValueError(
@@ -42,32 +50,131 @@ def get_mcp_endpoint(runtime_arn: str, region: str = "us-east-1") -> str:
     return f"https://bedrock-agentcore.{region}.amazonaws.com/runtimes/{encoded_arn}/invocations?qualifier=DEFAULT"
 
 
-def create_mcp_client(endpoint: str, access_token: str) -> MCPClient:
-    headers = {"Authorization": f"Bearer {access_token}"}
-    return MCPClient(
-        lambda: streamablehttp_client(endpoint, headers=headers, timeout=300)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a Strands Agent with the MCP tools")
+    parser.add_argument("prompt", nargs="?", default="Claude Skillsについて調べて。")
+    parser.add_argument(
+        "--endpoint",
+        help="MCP endpoint URL, e.g. record_proxy.py (default: derived from RUNTIME_ARN)",
     )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve prompts over HTTP (POST /invocations) instead of running one",
+    )
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=4,
+        help="MCP sessions kept open for concurrent invocations in --serve mode",
+    )
+    return parser.parse_args()
 
 
-def run_agent(mcp_client: MCPClient, prompt: str):
-    with mcp_client:
-        tools = mcp_client.list_tools_sync()
-        for tool in tools:
-            print(f"Loaded tool: {tool._agent_tool_name}")
-        agent = Agent(tools=tools)
-        agent(prompt)
-
+def create_mcp_client(endpoint: str) -> MCPClient:
+    # Headers are built per connection, so reconnects pick up the refreshed token.
+    return MCPClient(
+        lambda: streamablehttp_client(
+            endpoint,
+            headers={"Authorization": f"Bearer {token_provider.current()}"},
+            timeout=300,
+        )
+    )
 
-async def main():
-    validate_env_vars()
-    prompt = sys.argv[1] if len(sys.argv) > 1 else "Claude Skillsについて調べて。"
-    access_token = await get_access_token(access_token="")
-    runtime_arn = os.getenv("RUNTIME_ARN", "")
-    mcp_endpoint = get_mcp_endpoint(runtime_arn)
 
-    mcp_client = create_mcp_client(mcp_endpoint, access_token)
-    run_agent(mcp_client, prompt)
+async def fetch_tools(mcp_client: MCPClient) -> list:
+    tools = await asyncio.to_thread(mcp_client.list_tools_sync)
+    return [tool.mcp_tool for tool in tools]
+
+
+async def refresh_tool_cache(mcp_client: MCPClient, tool_cache: ToolCache):
+    try:
+        if tool_cache.update(await fetch_tools(mcp_client)):
+            print("\n♻️ Tool schemas changed on the server; cache updated for the next run")
+    except Exception as e:
+        print(f"\n⚠️ Tool list refresh failed: {e}")
+
+
+async def load_tools(mcp_client: MCPClient, tool_cache: ToolCache):
+    """Return the tool schemas and, when they came from the cache, a task re-checking them."""
+    tools = tool_cache.load()
+    if tools is None or tool_cache.stale:
+        tools = await fetch_tools(mcp_client)
+        tool_cache.update(tools)
+        return tools, None
+    # Start from the cached schemas and check for changes off the critical path.
+    print(f"Using cached tool list (version {tool_cache.version})")
+    return tools, asyncio.create_task(refresh_tool_cache(mcp_client, tool_cache))
+
+
+async def invoke_agent(mcp_client: MCPClient, tools: list, prompt: str, **agent_args):
+    agent = Agent(tools=[MCPAgentTool(tool, mcp_client) for tool in tools], **agent_args)
+    return await agent.invoke_async(prompt)
+
+
+async def run_once(endpoint: str, prompt: str):
+    await get_access_token()
+    pool = MCPClientPool(lambda: create_mcp_client(endpoint), max_size=1)
+    try:
+        async with pool.client() as mcp_client:
+            tools, refresh = await load_tools(mcp_client, ToolCache(endpoint))
+            for tool in tools:
+                print(f"Loaded tool: {tool.name}")
+            await invoke_agent(mcp_client, tools, prompt)
+            if refresh is not None:
+                await refresh
+    finally:
+        await pool.close()
+
+
+def create_app(endpoint: str, pool_size: int) -> BedrockAgentCoreApp:
+    """Agent service whose invocations borrow already-initialized MCP sessions from a pool."""
+    pool = MCPClientPool(lambda: create_mcp_client(endpoint), max_size=pool_size)
+    # One model client for all invocations instead of one per Agent.
+    model = BedrockModel()
+    state = {}
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await get_access_token()
+        token_provider.start_background_refresh()
+        async with pool.client() as mcp_client:
+            state["tools"], refresh = await load_tools(mcp_client, ToolCache(endpoint))
+            if refresh is not None:
+                await refresh
+        print(f"🚀 Serving with {len(state['tools'])} tools, pool size {pool_size}")
+        yield
+        await pool.close()
+        await token_provider.stop_background_refresh()
+
+    app = BedrockAgentCoreApp(lifespan=lifespan)
+
+    @app.entrypoint
+    async def invoke(payload: dict) -> dict:
+        async with pool.client() as mcp_client:
+            result = await invoke_agent(
+                mcp_client,
+                state["tools"],
+                payload.get("prompt", ""),
+                model=model,
+                callback_handler=None,
+            )
+        return {"result": str(result), "pool": pool.stats()}
+
+    return app
+
+
+def main():
+    args = parse_args()
+    validate_env_vars(endpoint=args.endpoint is None)
+    mcp_endpoint = args.endpoint or get_mcp_endpoint(os.getenv("RUNTIME_ARN", ""))
+
+    if args.serve:
+        create_app(mcp_endpoint, args.pool_size).run(port=args.port)
+    else:
+        asyncio.run(run_once(mcp_endpoint, args.prompt))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
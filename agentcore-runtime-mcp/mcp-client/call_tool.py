@@ -0,0 +1,239 @@
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+import uuid
+
+from dotenv import load_dotenv
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from resilience import ResilientCaller
+from token_provider import TokenProvider
+from tracing import flush, inject, setup_tracing, span
+
+load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
+
+TOOL_NAME = "openai_web_search"
+# Calls with the same Runtime session id are served by the same microVM.
+RUNTIME_SESSION_HEADER = "X-Amzn-Bedrock-AgentCore-Runtime-Session-Id"
+
+token_provider = TokenProvider(
+    provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
+    scopes=[
+        os.getenv("OAUTH2_SCOPE_READ"),
+        os.getenv("OAUTH2_SCOPE_WRITE"),
+    ],
+)
+
+
+async def get_access_token() -> str:
+    return await token_provider.get_token()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Call openai_web_search and print the answer as it streams in"
+    )
+    parser.add_argument("question", nargs="?", default="Claude Skillsについて調べて。")
+    parser.add_argument(
+        "--endpoint",
+        help="MCP endpoint URL (default: derived from RUNTIME_ARN)",
+    )
+    parser.add_argument(
+        "--no-auth",
+        action="store_true",
+        help="Send no Authorization header (for a local MCP server)",
+    )
+    parser.add_argument(
+        "--no-stream",
+        action="store_true",
+        help="Do not request progress notifications; print the answer at the end",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=300.0,
+        help="Seconds the call may take in total, across retries and hedges",
+    )
+    parser.add_argument(
+        "--max-attempts", type=int, default=3, help="Attempts per call, including the first"
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        help="Seconds before sending a duplicate request (default: p95 of earlier calls)",
+    )
+    parser.add_argument("--no-hedge", action="store_true", help="Never send a duplicate request")
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Ask the question this many times on one session and print resilience metrics",
+    )
+    parser.add_argument(
+        "--follow-up",
+        action="append",
+        default=[],
+        metavar="QUESTION",
+        help="Ask this as a follow-up on the same session (server needs MCP_STATEFUL=true); repeatable",
+    )
+    parser.add_argument(
+        "--trace-file",
+        help="Write OpenTelemetry spans to this JSON Lines file (default: OTEL_TRACES_FILE)",
+    )
+    return parser.parse_args()
+
+
+def validate_env_vars(endpoint: bool = True, auth: bool = True):
+    required = []
+    if endpoint:
+        required.append("RUNTIME_ARN")
+    if auth:
+        required += ["OAUTH2_PROVIDER_NAME", "OAUTH2_SCOPE_READ", "OAUTH2_SCOPE_WRITE"]
+    missing = [var for var in required if not os.getenv(var)]
+    if missing:
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+
+def get_mcp_endpoint(runtime_arn: str, region: str = "us-east-1") -> str:
+    encoded_arn = runtime_arn.replace(":", "%3A").replace("/", "%2F")
+    return f"https://bedrock-agentcore.{region}.amazonaws.com/runtimes/{encoded_arn}/invocations?qualifier=DEFAULT"
+
+
+class StreamPrinter:
+    """Prints partial answers from progress notifications as they arrive."""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.first_token = None
+        self.streamed = ""
+
+    async def __call__(self, progress: float, total: float | None, message: str | None):
+        if not message:
+            return
+        if self.first_token is None:
+            self.first_token = time.perf_counter() - self.start
+        self.streamed += message
+        print(message, end="", flush=True)
+
+
+async def call_tool(
+    caller: ResilientCaller,
+    question: str,
+    stream: bool,
+    deadline: float,
+    follow_up: bool = False,
+):
+    print(f"{'↪️' if follow_up else '🔍'} {question}\n")
+
+    start = time.perf_counter()
+    printer = StreamPrinter(start)
+    arguments = {"question": question, "follow_up": True} if follow_up else {"question": question}
+    result = await caller.call_tool(
+        TOOL_NAME,
+        arguments,
+        deadline=deadline,
+        progress_callback=printer if stream else None,
+        # A resent follow-up could be answered as a follow-up to itself.
+        idempotent=False if follow_up else None,
+    )
+    elapsed = time.perf_counter() - start
+
+    answer = "".join(c.text for c in result.content if c.type == "text")
+    if not printer.streamed:
+        # Cache hits and non-streaming servers send no progress.
+        print(answer, end="")
+    elif answer != printer.streamed:
+        print(f"\n\n⚠️ Streamed text differs from the final result:\n{answer}", end="")
+    print("\n")
+
+    if printer.first_token is not None:
+        print(f"⏱️ Time to first token: {printer.first_token:.3f}s")
+    print(f"⏱️ Total: {elapsed:.3f}s")
+
+
+@contextlib.asynccontextmanager
+async def open_session(endpoint: str, headers: dict, timeout: float):
+    async with streamablehttp_client(
+        endpoint, inject(headers), timeout=timeout, terminate_on_close=False
+    ) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            with span("mcp.initialize"):
+                await session.initialize()
+            yield session
+
+
+async def run(endpoint: str, access_token: str, args):
+    headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+    if args.follow_up:
+        # Follow-ups need the state kept by the microVM that answered the first question.
+        headers[RUNTIME_SESSION_HEADER] = str(uuid.uuid4())
+
+    with span("mcp.session", **{"server.address": endpoint}):
+        async with contextlib.AsyncExitStack() as stack:
+            session = await stack.enter_async_context(
+                open_session(endpoint, headers, args.deadline)
+            )
+            hedge_session = None
+            if not args.no_hedge and not args.follow_up:
+                # Another Runtime session is served by another microVM, whose
+                # single-flight search cannot merge the hedge into the original call.
+                hedge_session = await stack.enter_async_context(
+                    open_session(
+                        endpoint,
+                        {**headers, RUNTIME_SESSION_HEADER: str(uuid.uuid4())},
+                        args.deadline,
+                    )
+                )
+            caller = ResilientCaller(
+                session,
+                hedge_session=hedge_session,
+                default_deadline=args.deadline,
+                max_attempts=args.max_attempts,
+                hedge=not args.no_hedge,
+                hedge_after=args.hedge_after,
+            )
+            for _ in range(args.repeat):
+                try:
+                    await call_tool(
+                        caller, args.question, stream=not args.no_stream, deadline=args.deadline
+                    )
+                except Exception as e:
+                    print(f"❌ {type(e).__name__}: {e}\n")
+            for question in args.follow_up:
+                try:
+                    await call_tool(
+                        caller,
+                        question,
+                        stream=not args.no_stream,
+                        deadline=args.deadline,
+                        follow_up=True,
+                    )
+                except Exception as e:
+                    print(f"❌ {type(e).__name__}: {e}\n")
+            if args.repeat > 1:
+                print(f"📊 {caller.metrics()}")
+
+
+async def main():
+    args = parse_args()
+    validate_env_vars(endpoint=args.endpoint is None, auth=not args.no_auth)
+
+    access_token = "" if args.no_auth else await get_access_token()
+    endpoint = args.endpoint or get_mcp_endpoint(os.getenv("RUNTIME_ARN", ""))
+
+    setup_tracing("mcp-client", args.trace_file)
+    try:
+        await run(endpoint, access_token, args)
+    finally:
+        flush()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
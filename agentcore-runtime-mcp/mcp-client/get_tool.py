@@ -1,24 +1,28 @@
+import argparse
 import asyncio
 import os
 
-from bedrock_agentcore.identity.auth import requires_access_token
 from dotenv import load_dotenv
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 
+from token_provider import TokenProvider
+from tool_cache import ToolCache
+
 load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
 
 
-@requires_access_token(
+token_provider = TokenProvider(
     provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
     scopes=[
         os.getenv("OAUTH2_SCOPE_READ"),
         os.getenv("OAUTH2_SCOPE_WRITE"),
     ],
-    auth_flow="M2M",
 )
-async def get_access_token(*, access_token: str) -> str:
-    return access_token
+
+
+async def get_access_token() -> str:
+    return await token_provider.get_token()
 
 
 def validate_env_vars():
@@ -43,9 +47,19 @@ def print_tool_info(tool):
     print()
 
 
-async def list_tools(endpoint: str, access_token: str):
+def parse_args():
+    parser = argparse.ArgumentParser(description="List the tools of the MCP endpoint")
+    parser.add_argument(
+        "--cached",
+        action="store_true",
+        help="Print the cached tool list without connecting, if there is one",
+    )
+    return parser.parse_args()
+
+
+async def list_tools(endpoint: str, access_token: str, tool_cache: ToolCache):
     headers = {"Authorization": f"Bearer {access_token}"}
-    
+
     async with streamablehttp_client(
         endpoint, headers, timeout=120, terminate_on_close=False
     ) as (read_stream, write_stream, _):
@@ -55,15 +69,27 @@ async def list_tools(endpoint: str, access_token: str):
             for tool in tool_result.tools:
                 print_tool_info(tool)
 
+    previous_version = tool_cache.version
+    if tool_cache.update(tool_result.tools) and previous_version:
+        print(f"♻️ Tool schemas changed: {previous_version} -> {tool_cache.version}")
+
 
 async def main():
+    args = parse_args()
     validate_env_vars()
-    
-    access_token = await get_access_token(access_token="")
+
     runtime_arn = os.getenv("RUNTIME_ARN", "")
     mcp_endpoint = get_mcp_endpoint(runtime_arn)
-    
-    await list_tools(mcp_endpoint, access_token)
+    tool_cache = ToolCache(mcp_endpoint)
+    cached_tools = tool_cache.load()
+    if args.cached and cached_tools is not None:
+        print(f"📦 Cached tool list (version {tool_cache.version})\n")
+        for tool in cached_tools:
+            print_tool_info(tool)
+        return
+
+    access_token = await get_access_token()
+    await list_tools(mcp_endpoint, access_token, tool_cache)
 
 
 if __name__ == "__main__":
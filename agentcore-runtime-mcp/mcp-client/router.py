@@ -0,0 +1,390 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+from collections import deque
+
+import httpx
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+# Gateway prefixes tool names with the target name: "<target>___<tool>".
+TARGET_SEPARATOR = "___"
+ERROR_PREFIX = "Error occurred:"
+
+
+class ToolCallError(Exception):
+    """The backend answered, but the tool call failed."""
+
+
+def result_error(result) -> str | None:
+    """Error text of a tool result, or None if the call succeeded."""
+    text = "".join(c.text for c in result.content if c.type == "text")
+    if result.isError:
+        return text or "tool returned an error"
+    # The servers report failures as text rather than isError; through the
+    # Gateway it is wrapped in the Lambda's {"statusCode", "body"} response.
+    try:
+        response = json.loads(text)
+        if isinstance(response, dict) and response.get("statusCode", 200) >= 400:
+            return str(response.get("body"))
+    except ValueError:
+        pass
+    return text if text.startswith(ERROR_PREFIX) else None
+
+
+def get_mcp_endpoint(runtime_arn: str, region: str | None = None) -> str:
+    # The Runtime has to be called in the region it is deployed to.
+    region = region or runtime_arn.split(":")[3]
+    encoded_arn = runtime_arn.replace(":", "%3A").replace("/", "%2F")
+    return f"https://bedrock-agentcore.{region}.amazonaws.com/runtimes/{encoded_arn}/invocations?qualifier=DEFAULT"
+
+
+class BearerAuth(httpx.Auth):
+    """Sets the current access token on every request, so long-lived sessions survive refreshes."""
+
+    def __init__(self, get_token):
+        self.get_token = get_token
+
+    def auth_flow(self, request):
+        token = self.get_token()
+        if token:
+            request.headers["Authorization"] = f"Bearer {token}"
+        yield request
+
+
+class Backend:
+    """One MCP endpoint with its live latency and error statistics."""
+
+    def __init__(self, name: str, endpoint: str, alpha: float = 0.3, window: int = 50):
+        self.name = name
+        self.endpoint = endpoint
+        self.alpha = alpha
+        self.latency = None
+        self.error_rate = 0.0
+        self.samples = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.wins = 0
+        self.open_until = 0.0
+        self.last_sample = None
+        self.session = None
+        self.tool_names = {}
+        self.lock = asyncio.Lock()
+        self.task = None
+        self.closed = None
+
+    def p95(self) -> float | None:
+        if len(self.samples) < 10:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    def _update_latency(self, elapsed: float):
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency = self.alpha * elapsed + (1 - self.alpha) * self.latency
+        self.last_sample = time.monotonic()
+
+    def record_success(self, elapsed: float):
+        self.calls += 1
+        self.samples.append(elapsed)
+        self._update_latency(elapsed)
+        self.error_rate = (1 - self.alpha) * self.error_rate
+
+    def record_slow(self, elapsed: float):
+        # A call that lost a hedge race took at least `elapsed`; without this a
+        # stalled backend would keep its old estimate and stay the primary.
+        self._update_latency(elapsed)
+
+    def record_error(self):
+        self.calls += 1
+        self.errors += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "wins": self.wins,
+            "ewma_latency": round(self.latency, 3) if self.latency is not None else None,
+            "p95": round(self.p95(), 3) if self.p95() is not None else None,
+            "error_rate": round(self.error_rate, 3),
+        }
+
+
+class MCPRouter:
+    """Sends each tool call to the fastest healthy backend, hedging slow calls.
+
+    Backends are ranked by the EWMA of their successful call latencies; a
+    backend that has not answered yet ranks after the measured ones and gets
+    measured by hedges and failovers. A backend whose EWMA error rate exceeds
+    `error_threshold`, or that could not connect, is skipped for `cooldown`
+    seconds and then tried again, and an estimate older than `explore_after`
+    seconds ranks first, so a backend that got faster is noticed. If the
+    primary has not answered after `hedge_after` seconds (default: its recent p95 latency) the
+    call is also sent to the next backend, and the first successful result
+    wins; the other call is cancelled. A failed call fails over to the next
+    backend. Tools are addressed by their plain name: Gateway target prefixes
+    (`<target>___<tool>`) are mapped per backend.
+    """
+
+    def __init__(
+        self,
+        backends: list[Backend],
+        get_token=None,
+        hedge: bool = True,
+        hedge_after: float | None = None,
+        error_threshold: float = 0.5,
+        cooldown: float = 30.0,
+        explore_after: float = 60.0,
+        timeout: float = 300.0,
+    ):
+        self.backends = backends
+        self.get_token = get_token
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.explore_after = explore_after
+        self.timeout = timeout
+        self.hedges = 0
+
+    async def _serve(self, backend: Backend, ready: asyncio.Future, closed: asyncio.Event):
+        # The transport's task group must be entered and exited by the same
+        # task, so each session lives in a task of its own until it is closed.
+        try:
+            async with streamablehttp_client(
+                backend.endpoint,
+                timeout=self.timeout,
+                terminate_on_close=False,
+                auth=BearerAuth(self.get_token) if self.get_token else None,
+            ) as (read_stream, write_stream, _):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    tools = (await session.list_tools()).tools
+                    backend.tool_names = {
+                        tool.name.split(TARGET_SEPARATOR)[-1]: tool.name for tool in tools
+                    }
+                    backend.session = session
+                    ready.set_result(None)
+                    await closed.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+
+    async def _connect(self, backend: Backend):
+        async with backend.lock:
+            if backend.session is not None:
+                return
+            ready = asyncio.get_running_loop().create_future()
+            backend.closed = asyncio.Event()
+            backend.task = asyncio.create_task(self._serve(backend, ready, backend.closed))
+            await ready
+
+    async def _disconnect(self, backend: Backend):
+        task, backend.task, backend.session = backend.task, None, None
+        if task is not None:
+            backend.closed.set()
+            with contextlib.suppress(Exception):
+                await task
+
+    async def connect(self):
+        results = await asyncio.gather(
+            *(self._connect(backend) for backend in self.backends), return_exceptions=True
+        )
+        for backend, result in zip(self.backends, results):
+            if isinstance(result, BaseException):
+                print(f"⚠️ {backend.name}: connection failed: {result}")
+                backend.record_error()
+                backend.open_until = time.monotonic() + self.cooldown
+            else:
+                print(f"🔌 {backend.name}: {len(backend.tool_names)} tools")
+        if not any(backend.session for backend in self.backends):
+            raise RuntimeError("No MCP backend is reachable")
+
+    async def close(self):
+        await asyncio.gather(*(self._disconnect(backend) for backend in self.backends))
+
+    def ranked(self) -> list[Backend]:
+        now = time.monotonic()
+        # open_until is set by a failed connect or an error rate over the threshold.
+        healthy = [backend for backend in self.backends if now >= backend.open_until]
+
+        def score(backend: Backend) -> tuple[bool, float]:
+            # Stale estimates first, then the fastest, then backends never measured.
+            if backend.latency is None:
+                return True, 0.0
+            if now - backend.last_sample > self.explore_after:
+                return False, -1.0
+            return False, backend.latency
+
+        return sorted(healthy or self.backends, key=score)
+
+    async def _call(self, backend: Backend, name: str, arguments: dict, **kwargs):
+        start = time.perf_counter()
+        try:
+            if backend.session is None:
+                await self._connect(backend)
+            tool_name = backend.tool_names.get(name)
+            if tool_name is None:
+                raise ToolCallError(f"{backend.name} has no tool {name!r}")
+            result = await backend.session.call_tool(tool_name, arguments, **kwargs)
+            error = result_error(result)
+            if error is not None:
+                raise ToolCallError(error)
+        except asyncio.CancelledError:
+            backend.record_slow(time.perf_counter() - start)
+            raise
+        except Exception as e:
+            backend.record_error()
+            if backend.error_rate >= self.error_threshold:
+                backend.open_until = time.monotonic() + self.cooldown
+            if not isinstance(e, ToolCallError):
+                # Transport errors leave the session unusable; reconnect on next use.
+                await self._disconnect(backend)
+            raise
+        backend.record_success(time.perf_counter() - start)
+        return result
+
+    def _hedge_delay(self, backend: Backend) -> float | None:
+        if not self.hedge:
+            return None
+        return self.hedge_after if self.hedge_after is not None else backend.p95()
+
+    async def call_tool(self, name: str, arguments: dict, **kwargs):
+        """Call `name` on the best backend; returns (backend name, CallToolResult)."""
+        candidates = self.ranked()
+        pending = {}
+        errors = []
+
+        def launch():
+            backend = candidates.pop(0)
+            task = asyncio.ensure_future(self._call(backend, name, arguments, **kwargs))
+            pending[task] = backend
+
+        launch()
+        try:
+            while pending:
+                delay = None
+                if candidates and len(pending) == 1:
+                    delay = self._hedge_delay(next(iter(pending.values())))
+                done, _ = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # The primary is slower than usual; race the next backend.
+                    self.hedges += 1
+                    launch()
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    if task.exception() is None:
+                        backend.wins += 1
+                        return backend.name, task.result()
+                    errors.append(f"{backend.name}: {task.exception()}")
+                if not pending and candidates:
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        raise RuntimeError("All MCP backends failed: " + "; ".join(errors))
+
+    def stats(self) -> list[dict]:
+        return [backend.stats() for backend in self.backends]
+
+
+def backends_from_env() -> list[Backend]:
+    """Gateway URLs from GATEWAY_ENDPOINT_URL and Runtime ARNs from RUNTIME_ARN (comma-separated)."""
+    backends = []
+    for url in filter(None, os.getenv("GATEWAY_ENDPOINT_URL", "").split(",")):
+        url = url.strip()
+        backends.append(Backend(f"gateway:{httpx.URL(url).host.split('.')[0]}", url))
+    for arn in filter(None, os.getenv("RUNTIME_ARN", "").split(",")):
+        arn = arn.strip()
+        region = arn.split(":")[3]
+        backends.append(Backend(f"runtime:{region}", get_mcp_endpoint(arn, region)))
+    return backends
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Route openai_web_search calls to the fastest Runtime / Gateway backend"
+    )
+    parser.add_argument("questions", nargs="*", default=["Claude Skillsについて調べて。"])
+    parser.add_argument("--tool", default="openai_web_search")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Ask the questions this many times"
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        help="Seconds before hedging to the next backend (default: primary's p95)",
+    )
+    parser.add_argument("--no-hedge", action="store_true", help="Never send a call twice")
+    parser.add_argument(
+        "--no-auth",
+        action="store_true",
+        help="Send no Authorization header (for local MCP servers)",
+    )
+    return parser.parse_args()
+
+
+async def main():
+    from dotenv import load_dotenv
+
+    from token_provider import TokenProvider
+
+    load_dotenv(override=True, dotenv_path="../../agentcore-identity/.env")
+    args = parse_args()
+
+    backends = backends_from_env()
+    if not backends:
+        raise ValueError("Set GATEWAY_ENDPOINT_URL and/or RUNTIME_ARN (comma-separated)")
+
+    token_provider = None
+    if not args.no_auth:
+        token_provider = TokenProvider(
+            provider_name=os.getenv("OAUTH2_PROVIDER_NAME"),
+            scopes=[os.getenv("OAUTH2_SCOPE_READ"), os.getenv("OAUTH2_SCOPE_WRITE")],
+        )
+        await token_provider.get_token()
+        token_provider.start_background_refresh()
+
+    router = MCPRouter(
+        backends,
+        get_token=token_provider.current if token_provider else None,
+        hedge=not args.no_hedge,
+        hedge_after=args.hedge_after,
+    )
+    await router.connect()
+    try:
+        for i in range(args.repeat):
+            for question in args.questions:
+                start = time.perf_counter()
+                try:
+                    backend, result = await router.call_tool(args.tool, {"question": question})
+                    answer = "".join(c.text for c in result.content if c.type == "text")
+                    print(f"✅ [{i + 1}] {backend} {time.perf_counter() - start:.3f}s: {answer[:80]!r}")
+                except Exception as e:
+                    print(f"❌ [{i + 1}] {time.perf_counter() - start:.3f}s: {e}")
+    finally:
+        await router.close()
+        if token_provider:
+            await token_provider.stop_background_refresh()
+
+    print(f"\n📊 Hedged calls: {router.hedges}")
+    for stats in router.stats():
+        print(f"   {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+import asyncio
+import contextlib
+import time
+
+# Only the public MCPClient API (start, stop, list_tools_sync) is used, so
+# strands-agents upgrades need no pin; do not reach into its private members.
+from strands.tools.mcp import MCPClient
+
+
+class PooledClient:
+    def __init__(self, client: MCPClient):
+        self.client = client
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class MCPClientPool:
+    """Pool of connected, initialized Strands MCPClients for one endpoint.
+
+    `client()` lends a client exclusively to one agent invocation and takes it
+    back afterwards, so a long-running process pays connect + initialize only
+    when the pool grows or a connection has to be replaced. Before reuse a
+    client is dropped if it was idle longer than `max_idle` or is older than
+    `max_lifetime` (keep this below the access-token lifetime, since headers
+    are fixed per connection), and checked with a tools/list request if it
+    was idle longer than `health_check_after`. Clients that fail the check,
+    or were lent to an invocation that raised, are replaced by a new
+    connection from `factory`.
+    """
+
+    def __init__(
+        self,
+        factory,
+        max_size: int = 4,
+        max_idle: float = 300.0,
+        max_lifetime: float = 3000.0,
+        health_check_after: float = 30.0,
+        health_check_timeout: float = 5.0,
+    ):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.health_check_timeout = health_check_timeout
+
+        self._slots = asyncio.Semaphore(max_size)
+        self._idle = []
+        self._in_use = {}
+        self._reaper = None
+        self.connects = 0
+        self.reuses = 0
+        self.discards = 0
+
+    async def _connect(self) -> PooledClient:
+        client = self.factory()
+        await asyncio.to_thread(client.start)
+        self.connects += 1
+        return PooledClient(client)
+
+    async def _close(self, entry: PooledClient):
+        self.discards += 1
+        try:
+            await asyncio.to_thread(entry.client.stop, None, None, None)
+        except Exception as e:
+            print(f"⚠️ Failed to close MCP client: {e}")
+
+    def _expired(self, entry: PooledClient, now: float) -> bool:
+        return (
+            now - entry.last_used > self.max_idle
+            or now - entry.created_at > self.max_lifetime
+        )
+
+    async def _healthy(self, entry: PooledClient) -> bool:
+        if time.monotonic() - entry.last_used < self.health_check_after:
+            return True
+        try:
+            # Raises if the session has stopped; the cheapest round trip the public API offers.
+            await asyncio.wait_for(
+                asyncio.to_thread(entry.client.list_tools_sync), self.health_check_timeout
+            )
+            return True
+        except Exception:
+            return False
+
+    async def acquire(self) -> MCPClient:
+        await self._slots.acquire()
+        try:
+            if self._reaper is None:
+                self._reaper = asyncio.create_task(self._reap_idle())
+            entry = None
+            while self._idle:
+                # Most recently used first, so surplus clients age out.
+                candidate = self._idle.pop()
+                if not self._expired(candidate, time.monotonic()) and await self._healthy(
+                    candidate
+                ):
+                    entry = candidate
+                    self.reuses += 1
+                    break
+                await self._close(candidate)
+            if entry is None:
+                entry = await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        self._in_use[id(entry.client)] = entry
+        return entry.client
+
+    async def release(self, client: MCPClient, discard: bool = False):
+        entry = self._in_use.pop(id(client))
+        try:
+            if discard:
+                await self._close(entry)
+            else:
+                entry.last_used = time.monotonic()
+                self._idle.append(entry)
+        finally:
+            self._slots.release()
+
+    @contextlib.asynccontextmanager
+    async def client(self):
+        client = await self.acquire()
+        try:
+            yield client
+        except BaseException:
+            # The session may be what failed; do not lend it out again.
+            await self.release(client, discard=True)
+            raise
+        await self.release(client)
+
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(max(self.max_idle / 2, 1.0))
+            now = time.monotonic()
+            expired = [entry for entry in self._idle if self._expired(entry, now)]
+            for entry in expired:
+                self._idle.remove(entry)
+                await self._close(entry)
+
+    async def close(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+        idle, self._idle = self._idle, []
+        for entry in idle:
+            await self._close(entry)
+
+    def stats(self) -> dict:
+        return {
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "connects": self.connects,
+            "reuses": self.reuses,
+            "discards": self.discards,
+        }
@@ -0,0 +1,169 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from bedrock_agentcore.identity.auth import requires_access_token
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "agentcore-mcp" / "tokens"
+# The background refresh never runs more often than this, whatever the token lifetime.
+MIN_REFRESH_INTERVAL = 10.0
+
+
+def token_claim(token: str, claim: str) -> float | None:
+    """Return a time claim (`exp`, `iat`) of a JWT access token, without verifying it."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))[claim])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def token_expiry(token: str) -> float | None:
+    return token_claim(token, "exp")
+
+
+class TokenProvider:
+    """Caches M2M access tokens in memory and on disk, keyed by provider and scopes.
+
+    Tokens are reused until `refresh_margin` seconds before they expire, so
+    short-lived scripts skip the token round-trip on start and long runs can
+    refresh in the background instead of failing with 401 mid-way. For tokens
+    that live less than twice the margin, the margin shrinks to half their
+    lifetime, so they are still used for a while before each refresh. The disk
+    cache lives in `AGENTCORE_TOKEN_CACHE_DIR` (default
+    `~/.cache/agentcore-mcp/tokens`) and can be disabled with
+    `AGENTCORE_TOKEN_CACHE=memory`.
+    """
+
+    def __init__(
+        self,
+        provider_name: str,
+        scopes: list[str],
+        refresh_margin: float = 300.0,
+        default_ttl: float = 3600.0,
+    ):
+        self.provider_name = provider_name
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+
+        key = json.dumps([provider_name, sorted(map(str, scopes))]).encode()
+        cache_dir = Path(os.getenv("AGENTCORE_TOKEN_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self._cache_path = None
+        if os.getenv("AGENTCORE_TOKEN_CACHE", "disk") != "memory":
+            self._cache_path = cache_dir / f"{hashlib.sha256(key).hexdigest()[:32]}.json"
+
+        self._token = None
+        self._expires_at = 0.0
+        self._lifetime = default_ttl
+        self._lock = asyncio.Lock()
+        self._refresh_task = None
+
+        @requires_access_token(
+            provider_name=provider_name,
+            scopes=scopes,
+            auth_flow="M2M",
+        )
+        async def fetch(*, access_token: str) -> str:
+            return access_token
+
+        @requires_access_token(
+            provider_name=provider_name,
+            scopes=scopes,
+            auth_flow="M2M",
+            force_authentication=True,
+        )
+        async def fetch_new(*, access_token: str) -> str:
+            return access_token
+
+        self._fetch = fetch
+        self._fetch_new = fetch_new
+
+    def _margin(self) -> float:
+        return min(self.refresh_margin, self._lifetime / 2)
+
+    def _is_fresh(self) -> bool:
+        return bool(self._token) and time.time() < self._expires_at - self._margin()
+
+    def _set_lifetime(self):
+        issued_at = token_claim(self._token, "iat") or time.time()
+        self._lifetime = max(self._expires_at - issued_at, 0.0)
+
+    def _set_token(self, token: str):
+        self._token = token
+        self._expires_at = token_expiry(token) or time.time() + self.default_ttl
+        self._set_lifetime()
+
+    def _load_disk_cache(self):
+        if not self._cache_path or not self._cache_path.exists():
+            return
+        try:
+            cached = json.loads(self._cache_path.read_text())
+            self._token = cached["access_token"]
+            self._expires_at = cached["expires_at"]
+            self._set_lifetime()
+        except (OSError, KeyError, ValueError):
+            self._token = None
+
+    def _save_disk_cache(self):
+        if not self._cache_path:
+            return
+        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self._cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"access_token": self._token, "expires_at": self._expires_at}, f)
+
+    async def refresh(self, force: bool = True) -> str:
+        fetch = self._fetch_new if force else self._fetch
+        token = await fetch(access_token="")
+        self._set_token(token)
+        self._save_disk_cache()
+        return token
+
+    async def get_token(self) -> str:
+        if self._is_fresh():
+            return self._token
+        async with self._lock:
+            if not self._is_fresh():
+                self._load_disk_cache()
+            if not self._is_fresh():
+                # Force a new token if ours is near expiry; the vault would hand it back.
+                await self.refresh(force=self._token is not None)
+        return self._token
+
+    def current(self) -> str | None:
+        """Last known token, for synchronous callers that cannot await."""
+        return self._token
+
+    def start_background_refresh(self):
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop_background_refresh(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    async def _refresh_loop(self):
+        retry_delay = 5.0
+        while True:
+            await asyncio.sleep(
+                max(self._expires_at - self._margin() - time.time(), MIN_REFRESH_INTERVAL)
+            )
+            try:
+                async with self._lock:
+                    await self.refresh()
+                retry_delay = 5.0
+            except Exception as e:
+                print(f"⚠️ Token refresh failed, retrying in {retry_delay:.0f}s: {e}")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60.0)
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from mcp import types
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "agentcore-mcp" / "tools"
+
+
+def tools_version(tools: list[types.Tool]) -> str:
+    """Hash of the canonical JSON of a tools/list result."""
+    canonical = json.dumps(
+        [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+class ToolCache:
+    """Persists tools/list results per MCP endpoint so clients can skip it on start.
+
+    Each entry stores the tool schemas with a version hash of their canonical
+    JSON. Callers use a cached list right away and pass the result of a
+    background tools/list to `update()`, which reports whether the schemas
+    changed and stores them for the next start. Entries older than `max_age`
+    seconds are `stale` and should be fetched before use. The cache lives in
+    `AGENTCORE_TOOL_CACHE_DIR` (default `~/.cache/agentcore-mcp/tools`).
+    """
+
+    def __init__(self, endpoint: str, max_age: float = 86400.0):
+        self.endpoint = endpoint
+        self.max_age = max_age
+        self.version = None
+        self.fetched_at = None
+
+        cache_dir = Path(os.getenv("AGENTCORE_TOOL_CACHE_DIR", DEFAULT_CACHE_DIR))
+        key = hashlib.sha256(endpoint.encode()).hexdigest()[:32]
+        self.path = cache_dir / f"{key}.json"
+
+    @property
+    def stale(self) -> bool:
+        return self.fetched_at is None or time.time() - self.fetched_at > self.max_age
+
+    def load(self) -> list[types.Tool] | None:
+        try:
+            entry = json.loads(self.path.read_text())
+            if entry["endpoint"] != self.endpoint:
+                return None
+            tools = [types.Tool.model_validate(tool) for tool in entry["tools"]]
+        except (OSError, KeyError, ValueError):
+            return None
+        self.version = entry.get("version")
+        self.fetched_at = entry.get("fetched_at")
+        return tools
+
+    def update(self, tools: list[types.Tool]) -> bool:
+        """Store a fresh tools/list result; returns True if it differs from the cache."""
+        version = tools_version(tools)
+        changed = version != self.version
+        self.version = version
+        self.fetched_at = time.time()
+
+        entry = {
+            "endpoint": self.endpoint,
+            "version": self.version,
+            "fetched_at": self.fetched_at,
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry, ensure_ascii=False, indent=2))
+        # Atomic, so concurrent clients never read a half-written file.
+        os.replace(tmp_path, self.path)
+        return changed
@@ -0,0 +1,154 @@
+import argparse
+import json
+import math
+
+
+class LatencyHistogram:
+    """Fixed-memory, log-bucketed latency recorder.
+
+    Values (seconds) are stored as counts in logarithmic buckets whose width
+    bounds the relative error of any reported percentile to `relative_error`.
+    Memory depends only on the configured range, not on the number of samples,
+    and histograms with the same configuration can be merged losslessly, so
+    results from concurrent workers or separate runs can be combined.
+    """
+
+    def __init__(
+        self,
+        relative_error: float = 0.01,
+        min_value: float = 1e-6,
+        max_value: float = 3600.0,
+    ):
+        self.relative_error = relative_error
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self._counts = [0] * (self._index(max_value) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        value = min(max(value, self.min_value), self.max_value)
+        return math.ceil(math.log(value / self.min_value) / self._log_gamma)
+
+    def _bucket_value(self, index: int) -> float:
+        upper = self.min_value * self._gamma**index
+        return 2 * upper / (self._gamma + 1)
+
+    def record(self, value: float, count: int = 1):
+        self._counts[self._index(value)] += count
+        self.count += count
+        self.total += value * count
+        self.total_sq += value * value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        if self.config() != other.config():
+            raise ValueError("Cannot merge histograms with different configurations")
+        for index, bucket_count in enumerate(other._counts):
+            self._counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def stdev(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_sq - self.total * self.total / self.count) / (
+            self.count - 1
+        )
+        return math.sqrt(max(variance, 0.0))
+
+    def config(self) -> dict:
+        return {
+            "relative_error": self.relative_error,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            **self.config(),
+            "count": self.count,
+            "total": self.total,
+            "total_sq": self.total_sq,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "buckets": {str(i): c for i, c in enumerate(self._counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls(data["relative_error"], data["min_value"], data["max_value"])
+        for index, bucket_count in data["buckets"].items():
+            histogram._counts[int(index)] = bucket_count
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.total_sq = data["total_sq"]
+        if data["count"]:
+            histogram.min = data["min"]
+            histogram.max = data["max"]
+        return histogram
+
+
+def save_histograms(path: str, histograms: dict):
+    with open(path, "w") as f:
+        json.dump({name: h.to_dict() for name, h in histograms.items()}, f)
+
+
+def load_histograms(path: str) -> dict:
+    with open(path) as f:
+        return {name: LatencyHistogram.from_dict(d) for name, d in json.load(f).items()}
+
+
+def merge_histogram_files(paths: list[str]) -> dict:
+    merged = {}
+    for path in paths:
+        for name, histogram in load_histograms(path).items():
+            if name in merged:
+                merged[name].merge(histogram)
+            else:
+                merged[name] = histogram
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge histogram files saved with --save-histograms"
+    )
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("-o", "--output", help="Write the merged histograms here")
+    args = parser.parse_args()
+
+    merged = merge_histogram_files(args.paths)
+    if args.output:
+        save_histograms(args.output, merged)
+
+    from measure_latency import print_statistics
+
+    print_statistics(merged)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+import argparse
+import asyncio
+import base64
+import json
+import os
+import resource
+import time
+from datetime import timedelta
+
+from mcp import ClientSession, types
+from mcp.client.streamable_http import streamablehttp_client
+
+from histogram import LatencyHistogram
+from measure_latency import (
+    auth_headers,
+    get_access_token,
+    get_mcp_endpoint,
+    no_access_token,
+    token_provider,
+    validate_env_vars,
+)
+from results import environment_metadata
+
+TOOL_NAME = "echo_blob"
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+# AgentCore Runtime accepts payloads of up to 100MB.
+DEFAULT_SIZES = "1KB,64KB,1MB,10MB,50MB,100MB,120MB"
+
+
+def parse_size(value: str) -> int:
+    """Parse "512", "64KB" or "10MB" (binary units) into bytes."""
+    value = value.strip().upper()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            return int(float(value[: -len(unit)]) * SIZE_UNITS[unit])
+    return int(value)
+
+
+def format_size(size: int) -> str:
+    for unit in ("GB", "MB", "KB"):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def make_blob(size: int) -> str:
+    # Random base64, like the server's blob, so it cannot be compressed in transit.
+    return base64.b64encode(os.urandom(size * 3 // 4 + 3)).decode()[:size]
+
+
+def max_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def client_serialization(tool_name: str, arguments: dict, result: types.CallToolResult):
+    """Replay the SDK's JSON-RPC encoding of the request and decoding of the response.
+
+    Returns (request wire bytes, response wire bytes, seconds spent). The
+    tool's own JSON text is decoded too, since clients have to parse it.
+    """
+    start = time.perf_counter()
+    request = types.JSONRPCRequest(
+        jsonrpc="2.0",
+        id=1,
+        method="tools/call",
+        params={"name": tool_name, "arguments": arguments},
+    ).model_dump_json(by_alias=True, exclude_none=True)
+    encode = time.perf_counter() - start
+
+    response = types.JSONRPCResponse(
+        jsonrpc="2.0", id=1, result=result.model_dump(by_alias=True, exclude_none=True)
+    ).model_dump_json(by_alias=True, exclude_none=True)
+    start = time.perf_counter()
+    message = types.JSONRPCMessage.model_validate_json(response)
+    decoded = types.CallToolResult.model_validate(message.root.result)
+    json.loads(result_text(decoded))
+    decode = time.perf_counter() - start
+    return len(request.encode()), len(response.encode()), encode + decode
+
+
+def result_text(result: types.CallToolResult) -> str:
+    return "".join(c.text for c in result.content if c.type == "text")
+
+
+def echo_response(result: types.CallToolResult) -> tuple[int, dict]:
+    """(size of the returned blob, server metadata) from an echo_blob result."""
+    if result.isError:
+        raise RuntimeError(result_text(result)[:200])
+    data = json.loads(result_text(result))
+    blob = data.pop("blob", "")
+    return len(blob), data
+
+
+def describe_error(e: Exception) -> str:
+    # Validation errors span several lines; keep one short line per size.
+    return " ".join(f"{type(e).__name__}: {e}".split())[:200]
+
+
+def new_size_result(direction: str, request_bytes: int, response_bytes: int) -> dict:
+    return {
+        "direction": direction,
+        "request_bytes": request_bytes,
+        "response_bytes": response_bytes,
+        "calls": 0,
+        "errors": 0,
+        "error": None,
+        "latency": LatencyHistogram(),
+        "serialization": LatencyHistogram(),
+        "request_wire_bytes": None,
+        "response_wire_bytes": None,
+        "server": {},
+        "client_max_rss_mb": None,
+    }
+
+
+async def measure_size(
+    endpoint: str,
+    headers: dict,
+    tool_name: str,
+    result: dict,
+    iterations: int,
+    timeout: float,
+):
+    """Call the echo tool `iterations` times with one payload size on a new session."""
+    arguments = {
+        "payload": make_blob(result["request_bytes"]),
+        "response_bytes": result["response_bytes"],
+    }
+    async with streamablehttp_client(
+        endpoint, headers, timeout=timeout, terminate_on_close=False
+    ) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            for _ in range(iterations):
+                result["calls"] += 1
+                try:
+                    start = time.perf_counter()
+                    async with asyncio.timeout(timeout):
+                        response = await session.call_tool(
+                            tool_name,
+                            arguments,
+                            read_timeout_seconds=timedelta(seconds=timeout),
+                        )
+                    elapsed = time.perf_counter() - start
+                    received, server = echo_response(response)
+                except Exception as e:
+                    result["errors"] += 1
+                    result["error"] = describe_error(e)
+                    # The session may be unusable after a rejected payload.
+                    break
+                if received != result["response_bytes"]:
+                    result["errors"] += 1
+                    result["error"] = f"expected {result['response_bytes']} bytes, got {received}"
+                    continue
+                result["latency"].record(elapsed)
+                request_wire, response_wire, serialization = client_serialization(
+                    tool_name, arguments, response
+                )
+                result["serialization"].record(serialization)
+                result["request_wire_bytes"] = request_wire
+                result["response_wire_bytes"] = response_wire
+                result["server"] = server
+    result["client_max_rss_mb"] = round(max_rss_mb(), 1)
+
+
+async def run_sweep(
+    endpoint: str,
+    get_token,
+    tool_name: str,
+    direction: str,
+    sizes: list[int],
+    iterations: int,
+    timeout: float,
+    small: int,
+    keep_going: bool,
+) -> list[dict]:
+    """Grow one side of the exchange while the other stays `small` bytes."""
+    results = []
+    print(f"\n📦 {direction} sweep: {', '.join(format_size(s) for s in sizes)}")
+    for size in sizes:
+        if direction == "request":
+            result = new_size_result(direction, size, small)
+        else:
+            result = new_size_result(direction, small, size)
+        try:
+            await measure_size(
+                endpoint,
+                auth_headers(await get_token()),
+                tool_name,
+                result,
+                iterations,
+                timeout,
+            )
+        except Exception as e:
+            result["errors"] += 1
+            result["error"] = describe_error(e)
+        results.append(result)
+        print_size_result(result)
+        if result["latency"].count == 0 and not keep_going:
+            print(f"  ⛔ Every call failed at {format_size(size)}; stopping the {direction} sweep")
+            break
+    return results
+
+
+def throughput_mbps(result: dict) -> float | None:
+    if not result["latency"].count:
+        return None
+    moved = result["request_bytes"] + result["response_bytes"]
+    return moved / result["latency"].percentile(50) / SIZE_UNITS["MB"]
+
+
+def print_size_result(result: dict):
+    size = result["request_bytes" if result["direction"] == "request" else "response_bytes"]
+    latency = result["latency"]
+    if not latency.count:
+        print(f"  ❌ {format_size(size)}: {result['error']}")
+        return
+    print(
+        f"  ✅ {format_size(size)}: p50 {latency.percentile(50) * 1000:.2f}ms, "
+        f"{throughput_mbps(result):.2f}MB/s, "
+        f"serialization {result['serialization'].percentile(50) * 1000:.2f}ms"
+        + (f", {result['errors']} errors" if result["errors"] else "")
+    )
+
+
+def format_optional(value, spec: str = ".2f") -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def print_results(results: list[dict]):
+    print("\n" + "=" * 100)
+    print("📦 PAYLOAD SIZE SWEEP")
+    print("=" * 100)
+    print(
+        f"{'direction':>9} {'size':>7} {'ok':>7} {'p50 ms':>10} {'p90 ms':>10} {'MB/s':>8} "
+        f"{'ser. ms':>8} {'wire/size':>9} {'srv RSS':>8} {'cli RSS':>8}"
+    )
+    for result in results:
+        request = result["direction"] == "request"
+        size = result["request_bytes"] if request else result["response_bytes"]
+        wire = result["request_wire_bytes" if request else "response_wire_bytes"]
+        latency = result["latency"]
+        ok = f"{latency.count}/{result['calls']}"
+        print(
+            f"{result['direction']:>9} {format_size(size):>7} {ok:>7} "
+            f"{format_optional(latency.percentile(50) * 1000 if latency.count else None):>10} "
+            f"{format_optional(latency.percentile(90) * 1000 if latency.count else None):>10} "
+            f"{format_optional(throughput_mbps(result)):>8} "
+            f"{format_optional(result['serialization'].percentile(50) * 1000 if latency.count else None):>8} "
+            f"{format_optional(wire / size if wire and size else None, '.3f'):>9} "
+            f"{format_optional(result['server'].get('max_rss_mb'), '.1f'):>8} "
+            f"{format_optional(result['client_max_rss_mb'], '.1f'):>8}"
+        )
+    failures = [r for r in results if r["error"]]
+    if failures:
+        print("\n  Errors:")
+        for result in failures:
+            size = result["request_bytes" if result["direction"] == "request" else "response_bytes"]
+            print(f"  {result['direction']} {format_size(size)}: {result['error']}")
+
+
+def to_record(result: dict) -> dict:
+    record = {k: v for k, v in result.items() if k not in ("latency", "serialization")}
+    record["throughput_mbps"] = throughput_mbps(result)
+    record["latency"] = result["latency"].to_dict()
+    record["serialization"] = result["serialization"].to_dict()
+    return record
+
+
+async def resolve_tool_name(endpoint: str, access_token: str) -> str:
+    async with streamablehttp_client(
+        endpoint, auth_headers(access_token), timeout=120, terminate_on_close=False
+    ) as (read_stream, write_stream, _):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            tools = (await session.list_tools()).tools
+    for tool in tools:
+        if tool.name == TOOL_NAME:
+            return tool.name
+    raise ValueError(f"{TOOL_NAME} not found; deploy the latest test_mcp_server")
+
+
+def parse_sizes(value: str) -> list[int]:
+    return [parse_size(v) for v in value.split(",") if v]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure latency, throughput and memory for growing tool inputs and outputs"
+    )
+    parser.add_argument(
+        "--endpoint",
+        help="MCP endpoint URL, e.g. a local server (defaults to the RUNTIME_ARN endpoint)",
+    )
+    parser.add_argument(
+        "--no-auth",
+        action="store_true",
+        help="Do not fetch an access token (for local servers)",
+    )
+    parser.add_argument(
+        "--direction",
+        choices=["request", "response", "both"],
+        default="both",
+        help="Grow the tool input, the tool output, or each in turn",
+    )
+    parser.add_argument(
+        "--request-sizes",
+        type=parse_sizes,
+        default=DEFAULT_SIZES,
+        help="Comma-separated payload sizes sent to the tool (B, KB, MB or GB)",
+    )
+    parser.add_argument(
+        "--response-sizes",
+        type=parse_sizes,
+        default=DEFAULT_SIZES,
+        help="Comma-separated blob sizes returned by the tool (B, KB, MB or GB)",
+    )
+    parser.add_argument(
+        "--small-size",
+        type=parse_size,
+        default="1KB",
+        help="Size of the side that is not being swept",
+    )
+    parser.add_argument("--iterations", type=int, default=5, help="Calls per size")
+    parser.add_argument(
+        "--timeout", type=float, default=300.0, help="Seconds before a call is counted as failed"
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="Try larger sizes even after every call at a smaller size failed",
+    )
+    parser.add_argument("--output", metavar="PATH", help="Write the results as JSON")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    validate_env_vars(endpoint=not args.endpoint, auth=not args.no_auth)
+
+    if args.no_auth:
+        get_token = no_access_token
+    else:
+        get_token = get_access_token
+        await get_access_token()
+        token_provider.start_background_refresh()
+    mcp_endpoint = args.endpoint or get_mcp_endpoint(os.getenv("RUNTIME_ARN", ""))
+    tool_name = await resolve_tool_name(mcp_endpoint, await get_token())
+
+    results = []
+    for direction in ("request", "response"):
+        if args.direction in (direction, "both"):
+            results += await run_sweep(
+                mcp_endpoint,
+                get_token,
+                tool_name,
+                direction,
+                args.request_sizes if direction == "request" else args.response_sizes,
+                iterations=args.iterations,
+                timeout=args.timeout,
+                small=args.small_size,
+                keep_going=args.keep_going,
+            )
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "run": environment_metadata(mcp_endpoint, vars(args)),
+                    "results": [to_record(r) for r in results],
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+    await token_provider.stop_background_refresh()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_SERVER_DIR = BASE_DIR.parent / "cdk-runtime-mcp" / "mcp_server"
+# Same module import as `python -m src.mcp_server`, but on a port of our choosing.
+LAUNCHER = (
+    "from src.mcp_server import mcp; mcp.settings.port = {port}; "
+    "mcp.run(transport='streamable-http')"
+)
+CONTAINER_PORT = 8000
+POLL_INTERVAL = 0.005
+INITIALIZE_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "measure-startup", "version": "0.1.0"},
+    },
+}
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def default_python(server_dir: Path) -> str:
+    venv_python = server_dir / ".venv" / "bin" / "python"
+    return str(venv_python) if venv_python.exists() else sys.executable
+
+
+def server_command(args, port: int, name: str) -> list[str]:
+    if args.image:
+        env_flags = [flag for item in args.env for flag in ("-e", item)]
+        return [
+            "docker",
+            "run",
+            "--rm",
+            "--name",
+            name,
+            "-p",
+            f"{port}:{CONTAINER_PORT}",
+            *env_flags,
+            args.image,
+        ]
+    return [args.python, "-c", LAUNCHER.format(port=port)]
+
+
+def is_listening(port: int) -> bool:
+    with socket.socket() as sock:
+        sock.settimeout(POLL_INTERVAL)
+        return sock.connect_ex(("127.0.0.1", port)) == 0
+
+
+def is_ready(client: httpx.Client, url: str) -> bool:
+    try:
+        response = client.post(
+            url,
+            json=INITIALIZE_REQUEST,
+            headers={"Accept": "application/json, text/event-stream"},
+        )
+    except httpx.HTTPError:
+        return False
+    return response.status_code == 200
+
+
+def run_once(args, port: int) -> dict:
+    """Start the server and time exec -> port accepting connections -> first initialize response."""
+    name = f"measure-startup-{uuid.uuid4().hex[:8]}"
+    url = f"http://127.0.0.1:{port}/mcp"
+    env = {**os.environ, **dict(item.split("=", 1) for item in args.env)}
+    times = {}
+
+    with tempfile.TemporaryFile() as log, httpx.Client(timeout=5) as client:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            server_command(args, port, name),
+            cwd=args.server_dir,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            deadline = started + args.timeout
+            while time.perf_counter() < deadline:
+                if process.poll() is not None:
+                    break
+                if "listening" not in times and is_listening(port):
+                    times["listening"] = time.perf_counter() - started
+                if "listening" in times and is_ready(client, url):
+                    times["ready"] = time.perf_counter() - started
+                    break
+                time.sleep(POLL_INTERVAL)
+        finally:
+            if args.image:
+                subprocess.run(["docker", "rm", "-f", name], capture_output=True)
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+        if "ready" not in times:
+            log.seek(0)
+            output = log.read().decode(errors="replace").strip().splitlines()
+            reason = "exited" if process.returncode not in (None, -15) else "timed out"
+            raise RuntimeError(f"server {reason} before it was ready:\n" + "\n".join(output[-10:]))
+    return times
+
+
+def import_profile(args) -> tuple[float, list[tuple[str, float]]]:
+    """Import the server module once with -X importtime; returns (total, self time by package)."""
+    result = subprocess.run(
+        [args.python, "-X", "importtime", "-c", "import src.mcp_server"],
+        cwd=args.server_dir,
+        env={**os.environ, **dict(item.split("=", 1) for item in args.env)},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    by_package = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        by_package[module.split(".")[0]] += int(self_us) / 1e6
+        if module == "src.mcp_server":
+            total = int(cumulative_us) / 1e6
+    ranked = sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+    return total, ranked
+
+
+def print_summary(samples: list[dict]):
+    print("\n" + "=" * 60)
+    print("🚀 STARTUP TIME (seconds from exec)")
+    print("=" * 60)
+    print(f"{'phase':>10} {'runs':>5} {'min':>8} {'median':>8} {'max':>8}")
+    for phase in ("listening", "ready"):
+        values = [s[phase] for s in samples if phase in s]
+        if values:
+            print(
+                f"{phase:>10} {len(values):>5} {min(values):>8.3f} "
+                f"{statistics.median(values):>8.3f} {max(values):>8.3f}"
+            )
+
+
+def print_import_profile(total: float, ranked: list[tuple[str, float]], top: int):
+    print(f"\n📦 Import time of src.mcp_server: {total:.3f}s (self time by package, top {top})")
+    for package, seconds in ranked[:top]:
+        print(f"  {package:<30} {seconds * 1000:>8.1f}ms")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Measure the time from exec to the first initialize response of the MCP server"
+    )
+    parser.add_argument(
+        "--server-dir",
+        type=Path,
+        default=DEFAULT_SERVER_DIR,
+        help="Directory containing src/mcp_server.py (default: the Runtime MCP server)",
+    )
+    parser.add_argument(
+        "--python",
+        help="Python interpreter to start the server with (default: <server-dir>/.venv/bin/python)",
+    )
+    parser.add_argument(
+        "--image",
+        help="Start this container image with docker run instead of a local process",
+    )
+    parser.add_argument(
+        "--env",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Environment variable for the server, e.g. OPENAI_PREWARM=true (repeatable)",
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, help="Port to listen on (default: a free port)")
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Seconds to wait for each start"
+    )
+    parser.add_argument(
+        "--import-profile",
+        type=int,
+        nargs="?",
+        const=15,
+        metavar="TOP",
+        help="Also profile imports with -X importtime and show the slowest packages",
+    )
+    parser.add_argument("--output", metavar="PATH", help="Write the samples as JSON")
+    args = parser.parse_args()
+    args.python = args.python or default_python(args.server_dir)
+    return args
+
+
+def main():
+    args = parse_args()
+    target = args.image or f"{args.server_dir} ({args.python})"
+    print(f"🚀 Measuring startup of {target}, {args.runs} runs")
+
+    samples = []
+    for run in range(1, args.runs + 1):
+        try:
+            times = run_once(args, args.port or free_port())
+        except RuntimeError as e:
+            print(f"  ❌ Run {run}: {e}")
+            continue
+        samples.append(times)
+        print(
+            f"  Run {run}: listening {times['listening']:.3f}s, ready {times['ready']:.3f}s"
+        )
+    print_summary(samples)
+
+    profile = None
+    if args.import_profile:
+        if args.image:
+            print("\n⚠️ --import-profile profiles the local server only; skipped with --image")
+        else:
+            total, ranked = import_profile(args)
+            print_import_profile(total, ranked, args.import_profile)
+            profile = {"total": total, "by_package": dict(ranked)}
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"target": target, "env": args.env, "samples": samples, "import_profile": profile},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
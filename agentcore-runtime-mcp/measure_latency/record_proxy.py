@@ -0,0 +1,256 @@
+import argparse
+import contextlib
+import json
+import os
+import time
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+from measure_latency import get_mcp_endpoint
+
+MCP_SESSION_ID_HEADER = "mcp-session-id"
+RUNTIME_SESSION_HEADER = "x-amzn-bedrock-agentcore-runtime-session-id"
+# Session ids the proxy hands out itself when the server is stateless.
+PROXY_SESSION_PREFIX = "recorded-"
+# Set by httpx or uvicorn for the forwarded message, or hop-by-hop.
+SKIPPED_REQUEST_HEADERS = {"host", "content-length", "connection", "keep-alive", "transfer-encoding"}
+# The body is forwarded decoded, so its encoding and length no longer apply.
+SKIPPED_RESPONSE_HEADERS = SKIPPED_REQUEST_HEADERS | {"content-encoding"}
+
+
+def parse_messages(body: bytes) -> list[dict]:
+    """JSON-RPC messages in a request body (a single message or a batch)."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return []
+    messages = data if isinstance(data, list) else [data]
+    return [m for m in messages if isinstance(m, dict)]
+
+
+def response_messages(body: bytes, content_type: str) -> list[dict]:
+    """JSON-RPC messages in a JSON or SSE (streamable HTTP) response body."""
+    if "text/event-stream" not in content_type:
+        return parse_messages(body)
+    messages = []
+    for line in body.decode(errors="replace").splitlines():
+        if line.startswith("data:"):
+            messages += parse_messages(line[5:].encode())
+    return messages
+
+
+def reply_bytes(messages: list[dict], request_id) -> int | None:
+    for message in messages:
+        if message.get("id") == request_id:
+            return len(json.dumps(message, ensure_ascii=False).encode())
+    return None
+
+
+def call_error(messages: list[dict], request_id) -> str | None:
+    for message in messages:
+        if message.get("id") != request_id:
+            continue
+        if "error" in message:
+            return str(message["error"].get("message"))[:200]
+        result = message.get("result") or {}
+        text = "".join(c.get("text", "") for c in result.get("content", []) if isinstance(c, dict))
+        if result.get("isError") or text.startswith("Error occurred:"):
+            return text[:200] or "tool returned an error"
+    return None
+
+
+def redact(value):
+    # Keep sizes and structure, drop content: every string becomes "x" * len.
+    if isinstance(value, str):
+        return "x" * len(value)
+    if isinstance(value, list):
+        return [redact(v) for v in value]
+    if isinstance(value, dict):
+        return {k: redact(v) for k, v in value.items()}
+    return value
+
+
+class TrafficRecorder:
+    """Writes one JSON line per JSON-RPC request that passes through the proxy.
+
+    Each line has the arrival time `t` (seconds since the proxy started), a
+    short `session` alias, `method`, `tool` and `arguments` for tools/call,
+    the request and response sizes, `duration` to the last response byte, the
+    HTTP `status` and `error` (JSON-RPC error or failed tool result). Requests
+    sent in a batch share one response body, so each gets the size of its own
+    reply message and `batch`, the number of requests in the batch. Requests
+    are grouped into sessions by Mcp-Session-Id, else the Runtime session id,
+    else the client connection; an initialize request always starts a new one.
+    Stateless servers assign no Mcp-Session-Id, so the proxy gives the client
+    one of its own and strips it again before forwarding.
+    """
+
+    def __init__(self, path: str, redact_arguments: bool = False):
+        self.file = open(path, "a", encoding="utf-8")
+        self.redact_arguments = redact_arguments
+        self.started = time.monotonic()
+        self._aliases = {}
+        self.sessions = 0
+        self.records = 0
+
+    def _new_alias(self, key: str) -> str:
+        self.sessions += 1
+        alias = self._aliases[key] = f"s{self.sessions}"
+        return alias
+
+    def session(self, request: Request, messages: list[dict]) -> str:
+        session_id = request.headers.get(MCP_SESSION_ID_HEADER)
+        if session_id:
+            return self._aliases.get(session_id) or self._new_alias(session_id)
+        if request.headers.get(RUNTIME_SESSION_HEADER):
+            key = f"runtime:{request.headers[RUNTIME_SESSION_HEADER]}"
+        elif request.client:
+            key = f"connection:{request.client.host}:{request.client.port}"
+        else:
+            key = "unknown"
+        if any(m.get("method") == "initialize" for m in messages) or key not in self._aliases:
+            return self._new_alias(key)
+        return self._aliases[key]
+
+    def link(self, session_id: str | None, alias: str):
+        # The server assigns Mcp-Session-Id in the initialize response.
+        if session_id and session_id not in self._aliases:
+            self._aliases[session_id] = alias
+
+    def write(
+        self,
+        arrived: float,
+        alias: str,
+        messages: list[dict],
+        response: httpx.Response,
+        body: bytes,
+    ):
+        finished = time.monotonic()
+        replies = response_messages(body, response.headers.get("content-type", ""))
+        for message in messages:
+            record = {
+                "t": round(arrived - self.started, 3),
+                "session": alias,
+                "method": message["method"],
+                "request_bytes": len(json.dumps(message, ensure_ascii=False).encode()),
+                "response_bytes": len(body),
+                "duration": round(finished - arrived, 4),
+                "status": response.status_code,
+                "error": call_error(replies, message["id"]),
+            }
+            if len(messages) > 1:
+                record["response_bytes"] = reply_bytes(replies, message["id"])
+                record["batch"] = len(messages)
+            if message["method"] == "tools/call":
+                params = message.get("params") or {}
+                arguments = params.get("arguments") or {}
+                record["tool"] = params.get("name")
+                record["arguments"] = redact(arguments) if self.redact_arguments else arguments
+            self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.records += 1
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def create_app(upstream: str, recorder: TrafficRecorder) -> Starlette:
+    client = httpx.AsyncClient(timeout=None)
+
+    async def proxy(request: Request):
+        arrived = time.monotonic()
+        own_session = request.headers.get(MCP_SESSION_ID_HEADER, "").startswith(
+            PROXY_SESSION_PREFIX
+        )
+        if own_session and request.method == "DELETE":
+            # The server never knew this session; nothing to terminate.
+            return Response(status_code=200)
+        body = await request.body()
+        # Requests only: notifications and responses to the server are not replayed.
+        messages = [
+            m
+            for m in (parse_messages(body) if request.method == "POST" else [])
+            if "id" in m and "method" in m
+        ]
+        alias = recorder.session(request, messages) if messages else None
+        skipped = SKIPPED_REQUEST_HEADERS | ({MCP_SESSION_ID_HEADER} if own_session else set())
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in skipped}
+        response = await client.send(
+            client.build_request(request.method, upstream, headers=headers, content=body),
+            stream=True,
+        )
+        response_headers = {
+            k: v for k, v in response.headers.items() if k.lower() not in SKIPPED_RESPONSE_HEADERS
+        }
+        if alias and any(m.get("method") == "initialize" for m in messages):
+            session_id = response.headers.get(MCP_SESSION_ID_HEADER)
+            if session_id is None and response.status_code == 200:
+                session_id = response_headers[MCP_SESSION_ID_HEADER] = PROXY_SESSION_PREFIX + alias
+            recorder.link(session_id, alias)
+
+        async def relay():
+            chunks = []
+            try:
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    yield chunk
+            finally:
+                await response.aclose()
+                if alias:
+                    recorder.write(arrived, alias, messages, response, b"".join(chunks))
+
+        return StreamingResponse(relay(), status_code=response.status_code, headers=response_headers)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        try:
+            yield
+        finally:
+            await client.aclose()
+            recorder.close()
+            print(f"📼 Recorded {recorder.records} requests in {recorder.sessions} sessions")
+
+    return Starlette(
+        routes=[Route("/mcp", proxy, methods=["GET", "POST", "DELETE"])],
+        lifespan=lifespan,
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Forward MCP traffic to an endpoint and record each JSON-RPC request for replay.py"
+    )
+    parser.add_argument(
+        "--upstream",
+        help="MCP endpoint to forward to (defaults to the RUNTIME_ARN endpoint)",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument(
+        "--output", default="traffic.jsonl", help="JSON Lines file to append the records to"
+    )
+    parser.add_argument(
+        "--redact",
+        action="store_true",
+        help="Record tool arguments with every string replaced by x's of the same length",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.upstream and not os.getenv("RUNTIME_ARN"):
+        raise ValueError("Set RUNTIME_ARN or pass --upstream")
+    upstream = args.upstream or get_mcp_endpoint(os.getenv("RUNTIME_ARN", ""))
+    recorder = TrafficRecorder(args.output, redact_arguments=args.redact)
+    print(f"📼 Recording http://{args.host}:{args.port}/mcp -> {upstream} into {args.output}")
+    uvicorn.run(create_app(upstream, recorder), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
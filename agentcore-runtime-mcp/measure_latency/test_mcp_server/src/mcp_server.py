@@ -1,10 +1,42 @@
+import base64
+import json
+import os
+import resource
+import time
+import uuid
+from functools import lru_cache
+
 from mcp.server.fastmcp import FastMCP
 from pydantic import Field
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from .metrics import Metrics
 
 mcp = FastMCP(name="test-greet-mcp-server", host="0.0.0.0", stateless_http=True)
+metrics = Metrics()
+
+# Set once per process, i.e. once per Runtime microVM.
+INSTANCE_ID = uuid.uuid4().hex[:12]
+STARTED_AT = time.time()
+tool_calls = 0
+# Upper bound for echo_blob responses; the Runtime payload limit is 100MB.
+MAX_BLOB_BYTES = int(os.getenv("MAX_BLOB_BYTES", str(128 * 1024 * 1024)))
+
+
+@lru_cache(maxsize=4)
+def make_blob(size: int) -> str:
+    # Random base64 cannot be compressed in transit; cached so calls measure transfer, not generation.
+    return base64.b64encode(os.urandom(size * 3 // 4 + 3)).decode()[:size]
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 
 @mcp.tool()
+@metrics.tool
 def greet_user(
     name: str = Field(description="The name of the person to greet"),
 ) -> str:
@@ -12,8 +44,56 @@ def greet_user(
     Args:
         name: The name of the user.
     """
+    global tool_calls
+    tool_calls += 1
     return f"Hello, {name}! Nice to meet you. This is a test message."
 
 
+@mcp.tool()
+@metrics.tool
+def server_info() -> str:
+    """Return metadata of the server instance, used to tell cold starts from warm calls.
+
+    Returns:
+        str: JSON with `instance_id`, `cold_start` (true if greet_user has been called only once
+        on this instance), `tool_calls` and `uptime_s`.
+    """
+    return json.dumps(
+        {
+            "instance_id": INSTANCE_ID,
+            "cold_start": tool_calls <= 1,
+            "tool_calls": tool_calls,
+            "uptime_s": round(time.time() - STARTED_AT, 3),
+        }
+    )
+
+
+# structured_output=False: otherwise the blob is sent twice, as text and as structuredContent.
+@mcp.tool(structured_output=False)
+@metrics.tool
+def echo_blob(
+    payload: str = Field(default="", description="Data to send to the server; only its size is used"),
+    response_bytes: int = Field(
+        default=0, ge=0, le=MAX_BLOB_BYTES, description="Size of the blob to return"
+    ),
+) -> str:
+    """Receive `payload` and return a blob of `response_bytes` characters, for payload-size benchmarks.
+
+    Returns:
+        str: JSON with `received_bytes`, `handler_ms`, `max_rss_mb` (peak memory of the server
+        process) and `blob`.
+    """
+    started = time.perf_counter()
+    blob = make_blob(response_bytes)
+    return json.dumps(
+        {
+            "received_bytes": len(payload),
+            "handler_ms": round((time.perf_counter() - started) * 1000, 3),
+            "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "blob": blob,
+        }
+    )
+
+
 if __name__ == "__main__":
     mcp.run(transport="streamable-http")